@@ -0,0 +1,128 @@
+"""
+Flash-sale concurrency benchmark: many parallel COD checkouts of one SKU.
+
+Seeds a small catalog into a throw-away SQLite file, gives one product a
+fixed stock, then fires --buyers checkouts at it from --concurrency
+threads through the real WSGI application. Verifies that exactly
+--stock units were sold (no overselling, no lost sales) and reports
+latency for successful and sold-out responses.
+
+    cd backend
+    python -m benchmarks.flash_sale --stock 200 --buyers 1000 --concurrency 16
+
+    # reserve first, then check out with the reservation ids
+    python -m benchmarks.flash_sale --reserve
+
+Exits with status 1 when the stock invariant is violated.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.loadtest import call_wsgi, percentile, seed, setup_django
+
+
+def checkout(app, user_id, auth, product_id, qty, reserve):
+    body = {
+        'items': [{'id': product_id, 'quantity': qty}],
+        'customer': {'name': 'Flash Buyer', 'phone': '0000000000'},
+    }
+    started = time.perf_counter()
+    if reserve:
+        status, _, _ = call_wsgi(app, 'POST', '/api/reservations/', body=body, headers=auth)
+        if status != 201:
+            return status, time.perf_counter() - started
+        # call_wsgi discards bodies; each user has one request in flight at
+        # a time, so their newest active reservation is the one just made
+        from core.models import StockReservation
+        body['reservation_ids'] = list(
+            StockReservation.objects.filter(user_id=user_id, product_id=product_id, status='active')
+            .order_by('-pk').values_list('pk', flat=True)[:1]
+        )
+    status, _, _ = call_wsgi(app, 'POST', '/api/checkout-cod/', body=body, headers=auth)
+    return status, time.perf_counter() - started
+
+
+def summarize(label, latencies):
+    if not latencies:
+        return f"{label:<10}{0:>7}"
+    ms = [value * 1000 for value in latencies]
+    return (f"{label:<10}{len(ms):>7}{percentile(ms, 50):>10.2f}{percentile(ms, 95):>10.2f}"
+            f"{percentile(ms, 99):>10.2f}{max(ms):>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stock', type=int, default=200)
+    parser.add_argument('--buyers', type=int, default=1000, help="Checkout attempts.")
+    parser.add_argument('--qty', type=int, default=1, help="Units per checkout.")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--users', type=int, default=50, help="Distinct buyers (at least --concurrency).")
+    parser.add_argument('--reserve', action='store_true', help="Reserve stock before each checkout.")
+    parser.add_argument('--sqlite-profile', choices=('tuned', 'plain'), default='tuned')
+    parser.add_argument('--db', help="SQLite file to seed/reuse (default: temporary file).")
+    args = parser.parse_args(argv)
+    if args.users < args.concurrency:
+        parser.error("--users must be at least --concurrency")
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='shop-flash-'), 'flash.sqlite3')
+    setup_django(db_path, args.sqlite_profile)
+    seed(products=100, orders=0, users=args.users, seed_value=1)
+
+    from django.contrib.auth.models import User
+    from django.core.wsgi import get_wsgi_application
+    from rest_framework_simplejwt.tokens import AccessToken
+    from core.models import OrderItem, Product
+
+    product = Product.objects.order_by('pk').first()
+    Product.objects.filter(pk=product.pk).update(stock=args.stock)
+    OrderItem.objects.filter(product=product).delete()
+    buyers = [
+        (user.pk, {'Authorization': f'Bearer {AccessToken.for_user(user)}'})
+        for user in User.objects.order_by('pk')[:args.users]
+    ]
+    app = get_wsgi_application()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(
+            lambda i: checkout(app, *buyers[i % len(buyers)], product.pk, args.qty, args.reserve),
+            range(args.buyers),
+        ))
+    wall = time.perf_counter() - started
+
+    sold = [elapsed for status, elapsed in results if status == 200]
+    sold_out = [elapsed for status, elapsed in results if status == 409]
+    errors = [status for status, _ in results if status not in (200, 409)]
+
+    product.refresh_from_db()
+    units_ordered = sum(OrderItem.objects.filter(product=product).values_list('quantity', flat=True))
+    expected = min(args.stock // args.qty, args.buyers) * args.qty
+
+    print(f"{args.buyers} checkouts of {args.qty} unit(s), stock {args.stock}, "
+          f"concurrency {args.concurrency}, {args.sqlite_profile} SQLite"
+          f"{', reserve first' if args.reserve else ''}")
+    print(f"{'':<10}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    print(summarize('sold', sold))
+    print(summarize('sold out', sold_out))
+    print(f"throughput {args.buyers / wall:.1f} checkouts/s, errors {len(errors)}"
+          + (f" {sorted(set(errors))}" if errors else ""))
+    print(f"units ordered {units_ordered}, expected {expected}, stock left {product.stock}")
+
+    ok = (
+        units_ordered == expected
+        and product.stock == args.stock - units_ordered
+        and not errors
+    )
+    print("OK: no overselling" if ok else "FAILED: stock invariant violated")
+    if sold:
+        print(f"mean successful checkout {statistics.mean(sold) * 1000:.2f} ms")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
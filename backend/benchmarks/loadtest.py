@@ -0,0 +1,318 @@
+"""
+Offline load test for the storefront and API hot paths.
+
+Seeds a synthetic catalog and order history into a throw-away SQLite file,
+then drives the real WSGI application in-process from a thread pool and
+reports p50/p95/p99 latency, throughput and SQL queries per request.
+
+    cd backend
+    python -m benchmarks.loadtest --products 20000 --orders 5000 \
+        --requests 500 --concurrency 8 --out bench_results.json
+
+    # compare against an earlier run
+    python -m benchmarks.loadtest --compare old.json --out new.json
+
+    # readers and checkout writers at once, tuned vs. stock SQLite
+    python -m benchmarks.loadtest --scenarios mixed --out tuned.json
+    python -m benchmarks.loadtest --scenarios mixed --sqlite-profile plain \
+        --compare tuned.json
+
+Nothing touches db.sqlite3; pass --db to keep/reuse the seeded database.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import urlencode
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ('index', 'product', 'api_products', 'api_categories', 'checkout_cod', 'mixed')
+# mixed: one request in MIXED_WRITE_SHARE is a checkout, the rest are reads
+MIXED_READS = ('product', 'api_products')
+MIXED_WRITE_SHARE = 0.25
+
+
+# ---------------------------------------------------------
+# DJANGO SETUP
+# ---------------------------------------------------------
+def setup_django(db_path, sqlite_profile='tuned'):
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    # Per-request SQL log lines would drown the report; keep N+1 warnings
+    os.environ.setdefault('SQL_LOG_LEVEL', 'WARNING')
+
+    from django.conf import settings
+    database = settings.DATABASES['default']
+    database['NAME'] = db_path
+    if sqlite_profile == 'plain':
+        # Stock Django SQLite: rollback journal, new connection per request.
+        # journal_mode is stored in the file, so switch it back explicitly.
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS'] = {'init_command': 'PRAGMA journal_mode=DELETE'}
+    # Production-like: no SQL logging in memory, no debug pages
+    settings.DEBUG = False
+
+    # The dev SECRET_KEY is short; PyJWT warns on every token it signs
+    warnings.filterwarnings('ignore', message='The HMAC key')
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+# ---------------------------------------------------------
+# SEEDING
+# ---------------------------------------------------------
+def seed(products, orders, users, seed_value):
+    from django.core.management import call_command
+    from core.models import Product
+
+    if Product.objects.count() >= products:
+        return
+    call_command(
+        'generate_catalog',
+        categories=20, products=products, users=users, orders=orders,
+        seed=seed_value, stdout=io.StringIO(),
+    )
+
+
+# ---------------------------------------------------------
+# IN-PROCESS WSGI DRIVER
+# ---------------------------------------------------------
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def call_wsgi(app, method, path, query=None, body=None, headers=None):
+    from django.db import connection
+
+    payload = json.dumps(body).encode() if body is not None else b''
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': urlencode(query or {}),
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'localhost',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(payload),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+
+    status = []
+    counter = QueryCounter()
+    started = time.perf_counter()
+    with connection.execute_wrapper(counter):
+        result = app(environ, lambda s, h, exc_info=None: status.append(s))
+        try:
+            for _ in result:
+                pass
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+    elapsed = time.perf_counter() - started
+    return int(status[0].split()[0]), elapsed, counter.count
+
+
+class Scenario:
+    def __init__(self, rng_seed):
+        from django.contrib.auth.models import User
+        from rest_framework_simplejwt.tokens import AccessToken
+        from core.models import Product
+
+        self.slugs = list(Product.objects.values_list('slug', flat=True)[:5000])
+        self.product_ids = list(Product.objects.values_list('id', flat=True)[:5000])
+        user = User.objects.order_by('pk').first()
+        self.auth = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        self.local = threading.local()
+        self.seed = rng_seed
+
+    @property
+    def rng(self):
+        if not hasattr(self.local, 'rng'):
+            self.local.rng = random.Random(f'{self.seed}-{threading.get_ident()}')
+        return self.local.rng
+
+    def pick(self, name):
+        if name != 'mixed':
+            return name
+        rng = self.rng
+        return 'checkout_cod' if rng.random() < MIXED_WRITE_SHARE else rng.choice(MIXED_READS)
+
+    def request(self, name):
+        rng = self.rng
+        if name == 'index':
+            return 'GET', '/home/', None, None, None
+        if name == 'product':
+            return 'GET', f'/product/{rng.choice(self.slugs)}/', None, None, None
+        if name == 'api_products':
+            return 'GET', '/api/products/', {'page_size': 20}, None, None
+        if name == 'api_categories':
+            return 'GET', '/api/categories/', None, None, None
+        if name == 'checkout_cod':
+            items = [{'id': pid, 'quantity': rng.randint(1, 3)}
+                     for pid in rng.sample(self.product_ids, rng.randint(1, 5))]
+            body = {'items': items, 'customer': {'name': 'Bench', 'phone': '0000000000'}}
+            return 'POST', '/api/checkout-cod/', None, body, self.auth
+        raise ValueError(name)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def run_scenario(app, scenario, name, requests, concurrency):
+    # Connections are closed (or kept, per CONN_MAX_AGE) by Django's own
+    # request_finished handling, as under a real threaded server
+    def one(_):
+        kind = scenario.pick(name)
+        method, path, query, body, headers = scenario.request(kind)
+        return (kind,) + call_wsgi(app, method, path, query, body, headers)
+
+    one(None)  # warm-up (imports, template loading, page cache)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        samples = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies = [elapsed * 1000 for _, _, elapsed, _ in samples]
+    result = {
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': sum(1 for _, status, _, _ in samples if status >= 400),
+        'throughput_rps': round(requests / wall, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'mean_queries': round(statistics.mean(q for _, _, _, q in samples), 2),
+    }
+    if name == 'mixed':
+        reads = [elapsed * 1000 for kind, _, elapsed, _ in samples if kind != 'checkout_cod']
+        writes = [elapsed * 1000 for kind, _, elapsed, _ in samples if kind == 'checkout_cod']
+        result.update({
+            'read_p95_ms': round(percentile(reads, 95), 2),
+            'write_p95_ms': round(percentile(writes, 95), 2),
+        })
+    return result
+
+
+# ---------------------------------------------------------
+# REPORTING
+# ---------------------------------------------------------
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results, baseline=None):
+    header = f"{'scenario':<16}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'errors':>8}"
+    print(header)
+    print('-' * len(header))
+    for name, r in results['scenarios'].items():
+        line = (f"{name:<16}{r['throughput_rps']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+                f"{r['p99_ms']:>10}{r['mean_queries']:>9}{r['errors']:>8}")
+        old = (baseline or {}).get('scenarios', {}).get(name)
+        if old and old['p95_ms']:
+            change = (r['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100
+            line += f"   p95 {change:+.0f}% vs {baseline['meta'].get('git') or 'baseline'}"
+        print(line)
+        if 'read_p95_ms' in r:
+            print(f"{'':<16}reads p95 {r['read_p95_ms']} ms, checkout writes p95 {r['write_p95_ms']} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--orders', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=500, help="Requests per scenario.")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sqlite-profile', choices=('tuned', 'plain'), default='tuned',
+                        help="tuned: settings as configured (WAL, pragmas, persistent connections); "
+                             "plain: stock SQLite for comparison.")
+    parser.add_argument('--db', help="SQLite file to seed/reuse (default: temporary file).")
+    parser.add_argument('--out', help="Write results JSON here.")
+    parser.add_argument('--compare', help="Earlier results JSON to compare p95 against.")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='shop-bench-'), 'bench.sqlite3')
+    setup_django(db_path, args.sqlite_profile)
+
+    started = time.perf_counter()
+    seed(args.products, args.orders, args.users, args.seed)
+    seed_seconds = time.perf_counter() - started
+
+    from django.core.wsgi import get_wsgi_application
+    import django
+    app = get_wsgi_application()
+    scenario = Scenario(args.seed)
+
+    results = {
+        'meta': {
+            'git': git_revision(),
+            'timestamp': datetime.now(dt_timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'products': args.products,
+            'orders': args.orders,
+            'sqlite_profile': args.sqlite_profile,
+            'seed_seconds': round(seed_seconds, 2),
+        },
+        'scenarios': {},
+    }
+    for name in args.scenarios.split(','):
+        results['scenarios'][name] = run_scenario(app, scenario, name, args.requests, args.concurrency)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+    print_report(results, baseline)
+
+    if args.out:
+        with open(args.out, 'w') as fh:
+            json.dump(results, fh, indent=2)
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
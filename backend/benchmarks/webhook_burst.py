@@ -0,0 +1,159 @@
+"""
+Stripe webhook burst benchmark: ingest a flood of events, then drain them.
+
+Seeds --orders pending online orders, each with a pending Payment, into a
+throw-away SQLite file. Signs one checkout.session.completed event per
+order plus --duplicates redeliveries of random ones, POSTs them all to
+/api/stripe/webhook/ from --concurrency threads through the real WSGI
+application, then applies the inbox with core.webhooks.apply_pending.
+
+    cd backend
+    python -m benchmarks.webhook_burst --orders 2000 --duplicates 500
+
+Checks that every order ends up paid exactly once, then replays the whole
+burst and checks that nothing changes. Exits with status 1 otherwise.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.loadtest import call_wsgi, percentile, seed, setup_django
+
+WEBHOOK_SECRET = 'whsec_benchmark'
+
+
+def make_events(orders):
+    events = []
+    for order_id, session_id, total in orders:
+        events.append({
+            'id': f'evt_bench_{order_id}',
+            'type': 'checkout.session.completed',
+            'data': {'object': {
+                'id': session_id,
+                'object': 'checkout.session',
+                'payment_status': 'paid',
+                'amount_total': int(total * 100),
+                'metadata': {'order_id': str(order_id)},
+            }},
+        })
+    return events
+
+
+def post_event(app, event):
+    import stripe
+    header = stripe.WebhookSignature.generate_signature_header(json.dumps(event), WEBHOOK_SECRET)
+    status, elapsed, _ = call_wsgi(
+        app, 'POST', '/api/stripe/webhook/', body=event, headers={'Stripe-Signature': header},
+    )
+    return status, elapsed
+
+
+def burst(app, events, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda event: post_event(app, event), events))
+    return results, time.perf_counter() - started
+
+
+def drain(batch_size):
+    from core import webhooks
+    started = time.perf_counter()
+    processed = webhooks.apply_pending(batch_size)
+    return processed, time.perf_counter() - started
+
+
+def snapshot():
+    from core.models import Order, Payment
+    return (
+        sorted(Order.objects.filter(payment_method='online').values_list('id', 'payment_status')),
+        sorted(Payment.objects.values_list('order_id', 'status')),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--duplicates', type=int, default=500, help="Redelivered events mixed into the burst.")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--sqlite-profile', choices=('tuned', 'plain'), default='tuned')
+    parser.add_argument('--db', help="SQLite file to seed/reuse (default: temporary file).")
+    args = parser.parse_args(argv)
+
+    os.environ['STRIPE_WEBHOOK_SECRET'] = WEBHOOK_SECRET
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='shop-webhook-'), 'webhook.sqlite3')
+    setup_django(db_path, args.sqlite_profile)
+    seed(products=100, orders=0, users=10, seed_value=1)
+
+    from django.contrib.auth.models import User
+    from django.core.wsgi import get_wsgi_application
+    from core.models import Job, Order, Payment, Product, StripeEvent
+    from core.orders import place_order
+
+    StripeEvent.objects.all().delete()
+    Job.objects.filter(task='core.tasks.apply_stripe_events').delete()
+    users = list(User.objects.order_by('pk')[:10])
+    product_ids = list(Product.objects.values_list('pk', flat=True))
+    rng = random.Random(1)
+    orders = []
+    for i in range(args.orders):
+        order = place_order(
+            users[i % len(users)],
+            {pid: rng.randint(1, 3) for pid in rng.sample(product_ids, rng.randint(1, 4))},
+            payment_method='online', payment_status='pending',
+        )
+        session_id = f'cs_test_bench_{order.pk}'
+        Payment.objects.create(
+            user_id=order.user_id, order=order, stripe_payment_id=session_id,
+            amount=order.total_amount, status='pending',
+        )
+        orders.append((order.pk, session_id, order.total_amount))
+
+    events = make_events(orders)
+    events += [rng.choice(events) for _ in range(args.duplicates)]
+    rng.shuffle(events)
+    app = get_wsgi_application()
+
+    results, ingest_wall = burst(app, events, args.concurrency)
+    errors = [status for status, _ in results if status != 200]
+    ms = [elapsed * 1000 for _, elapsed in results]
+    processed, drain_wall = drain(args.batch_size)
+    after_first = snapshot()
+
+    print(f"{len(events)} webhook deliveries ({args.orders} orders, {args.duplicates} duplicates), "
+          f"concurrency {args.concurrency}, {args.sqlite_profile} SQLite")
+    print(f"ingest   {len(events) / ingest_wall:>9.1f} events/s   p50 {percentile(ms, 50):.2f} ms   "
+          f"p95 {percentile(ms, 95):.2f} ms   p99 {percentile(ms, 99):.2f} ms   errors {len(errors)}")
+    print(f"drain    {processed / drain_wall if drain_wall else 0:>9.1f} events/s   "
+          f"{processed} stored events in batches of {args.batch_size}")
+
+    paid = Order.objects.filter(pk__in=[o[0] for o in orders], payment_status='paid').count()
+    succeeded = Payment.objects.filter(order_id__in=[o[0] for o in orders], status='success').count()
+    confirmations = Job.objects.filter(task='core.tasks.send_order_confirmation').count()
+    print(f"orders paid {paid}/{args.orders}, payments succeeded {succeeded}, "
+          f"confirmation jobs {confirmations}")
+
+    # Stripe retries whatever it wasn't sure we got: replay the lot
+    replay, _ = burst(app, events, args.concurrency)
+    replayed, _ = drain(args.batch_size)
+    unchanged = snapshot() == after_first
+    print(f"replay: {replayed} new events stored, state {'unchanged' if unchanged else 'CHANGED'}")
+
+    ok = (
+        not errors
+        and all(status == 200 for status, _ in replay)
+        and processed == args.orders
+        and paid == succeeded == confirmations == args.orders
+        and replayed == 0 and unchanged
+    )
+    print("OK: every order paid exactly once" if ok else "FAILED: webhook invariant violated")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -46,6 +46,8 @@ LOGOUT_REDIRECT_URL = '/'        # after logout, go to landing page
 #   MIDDLEWARE
 # ------------------------------
 MIDDLEWARE = [
+    'core.middleware.QueryInstrumentationMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -55,6 +57,34 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
 ]
 
+# Same query shape this many times in one request is logged as a likely N+1
+SQL_N_PLUS_ONE_THRESHOLD = 5
+
+# ------------------------------
+#   LOGGING
+# ------------------------------
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # One JSON line per request from QueryInstrumentationMiddleware
+        'core.sql': {
+            'handlers': ['console'],
+            'level': os.environ.get('SQL_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        # Retries and permanent failures from `manage.py run_jobs`
+        'core.jobs': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 # ------------------------------
 #   URL CONFIG
 # ------------------------------
@@ -87,13 +117,111 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # ------------------------------
 #   DATABASE
 # ------------------------------
+# WAL lets readers keep going while a checkout commits. synchronous=NORMAL
+# is durable across app crashes in WAL mode (only a power cut can lose
+# the last commits). IMMEDIATE transactions take the write lock at BEGIN,
+# so concurrent writers queue on the busy timeout instead of failing
+# with "database is locked" when upgrading a read lock.
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-20000',     # KiB, i.e. ~20 MB page cache per connection
+    'PRAGMA mmap_size=268435456',   # 256 MB of memory-mapped reads
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA foreign_keys=ON',
+)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections (and their warm page cache) between requests
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,  # busy timeout, seconds
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join(SQLITE_PRAGMAS),
+        },
+    }
+}
+
+# Read replicas: DB_REPLICAS=replica1.sqlite3,replica2.sqlite3 adds the
+# aliases replica_1, replica_2, ... Catalog and sales report reads
+# (REPLICA_READ_MODELS) are spread over them; writes and everything else
+# use the primary. Refresh local SQLite replicas with
+# `manage.py snapshot_replicas [--interval N]`.
+for i, name in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica_{i}'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+REPLICA_READ_MODELS = ('core.product', 'core.category', 'core.dailycategorysales', 'core.dailypaymentsales')
+
+# After a write, the client reads from the primary for this long
+REPLICA_PIN_SECONDS = 15
+
+# ------------------------------
+#   CACHE
+# ------------------------------
+# LocMemCache is per-process: each worker keeps its own copy of the
+# catalog fragments. Invalidation stays exact either way, since the catalog
+# version they are keyed on is read from the database (core.page_cache).
+# A shared backend (e.g. Redis) only saves re-rendering per worker.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'myshop'),
     }
 }
 
+# Catalog fragments are invalidated by version bumps; the timeout only
+# bounds how long superseded entries linger.
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Per-process caches can't be invalidated from another worker, so anything
+# that must disappear everywhere at once (sessions, session users) is only
+# read from the cache when it is shared.
+PER_PROCESS_CACHE = CACHES['default']['BACKEND'].endswith(('.LocMemCache', '.DummyCache'))
+
+# Session users are loaded through the cache (core.backends.get_cached_user)
+# and dropped on save, so a password change or deactivation is seen on the
+# next request. Skipped with a per-process cache: other workers would keep
+# their copy until it expired.
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
+
+# Session reads come from the cache (writes still go to the database), but
+# only when the cache is shared: with a per-process cache a logout would
+# only evict the session from the worker that handled it, and the others
+# would keep accepting it until it expired.
+SESSION_ENGINE = (
+    'django.contrib.sessions.backends.db' if PER_PROCESS_CACHE
+    else 'django.contrib.sessions.backends.cached_db'
+)
+
+# ------------------------------
+#   BACKGROUND JOBS
+# ------------------------------
+# Work queued with core.jobs.enqueue() runs in `manage.py run_jobs`.
+JOB_MAX_ATTEMPTS = 5
+JOB_BASE_BACKOFF = 10       # seconds before the first retry, doubled each time
+JOB_MAX_BACKOFF = 60 * 60
+# A job whose worker hasn't finished it within this many seconds is
+# assumed lost and handed to another worker
+JOB_VISIBILITY_TIMEOUT = 5 * 60
+
+# Reserved stock returns to sale if no order uses it within this time
+STOCK_RESERVATION_SECONDS = 10 * 60
+
+# ------------------------------
+#   EMAIL
+# ------------------------------
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'MyShop <orders@localhost>')
+
 # ------------------------------
 #   PASSWORD VALIDATORS
 # ------------------------------
@@ -114,6 +242,14 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# `manage.py collectstatic` fingerprints file names and writes .gz/.br
+# variants (core.assets). With DEBUG on, runserver serves the unhashed
+# sources; otherwise core.assets.serve handles STATIC_URL.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.assets.CompressedManifestStaticFilesStorage'},
+}
+
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -127,6 +263,9 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Rows fetched and written per chunk by /api/products/?format=jsonl
+PRODUCT_EXPORT_CHUNK_SIZE = 2000
+
 ALLOWED_HOSTS = [
     'aakash02.pythonanywhere.com',
     'localhost',
@@ -153,6 +292,31 @@ STRIPE_PUBLIC_KEY = os.environ.get(
     'pk_test_51SUWHsK8fYvT5V5ZvnbkBV1Lc5jU1SWw1WojQjgct3dedaoUVr6N0tk5iFQmvcBk4MoOYb6TCfRSjAfJ40j9gAaV00ogvGeuyM'  # Replace with your Stripe test publishable key
 )
 
+# Signing secret of the webhook endpoint (whsec_...). Events older than the
+# tolerance are rejected as replays; the inbox is applied in batches.
+STRIPE_WEBHOOK_SECRET = os.environ.get('STRIPE_WEBHOOK_SECRET', '')
+STRIPE_WEBHOOK_TOLERANCE = 300  # seconds
+STRIPE_EVENT_BATCH_SIZE = int(os.environ.get('STRIPE_EVENT_BATCH_SIZE', '500'))
+
+# ------------------------------
+#   PAYMENT GATEWAY
+# ------------------------------
+# core.payments.LocalGateway is an in-process stand-in for load tests;
+# LOCAL_GATEWAY_LATENCY simulates a slow provider.
+PAYMENT_GATEWAY = os.environ.get('PAYMENT_GATEWAY', 'core.payments.StripeGateway')
+LOCAL_GATEWAY_LATENCY = float(os.environ.get('LOCAL_GATEWAY_LATENCY', '0'))
+
+# Checkout sessions are created inside the request, so a worker can wait
+# up to (connect + read) * (1 + retries) = 26s on an unresponsive provider
+STRIPE_CONNECT_TIMEOUT = 3   # seconds
+STRIPE_READ_TIMEOUT = 10     # seconds
+STRIPE_MAX_NETWORK_RETRIES = 1
+
+# Concurrent provider calls per process, and how long a request may wait
+# for a free slot before getting a 503
+PAYMENT_GATEWAY_MAX_CONCURRENCY = int(os.environ.get('PAYMENT_GATEWAY_MAX_CONCURRENCY', '4'))
+PAYMENT_GATEWAY_QUEUE_TIMEOUT = 0.5
+
 # ------------------------------
 #   FRONTEND URL
 # ------------------------------
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.urls import path, include
-from core import views as core_views
+from core import assets, views as core_views
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
@@ -49,6 +49,9 @@ urlpatterns = [
 
     # API
     path('api/', include('core.api_urls')),
+
+    # Collected static files (hashed + precompressed, see core.assets)
+    path(settings.STATIC_URL.lstrip('/') + '<path:path>', assets.serve, name='static-asset'),
 ]
 
 # Media files
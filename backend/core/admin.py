@@ -1,6 +1,58 @@
 from django.contrib import admin
-from .models import Category, Product, Order, OrderItem
+from django.template.response import TemplateResponse
+
+from . import analytics
+from .models import Category, Product, Order, OrderItem, Job, StockReservation, StripeEvent, DailyPaymentSales
 admin.site.register(Category)
 admin.site.register(Product)
 admin.site.register(Order)
 admin.site.register(OrderItem)
+admin.site.register(Job)
+admin.site.register(StockReservation)
+admin.site.register(StripeEvent)
+
+
+@admin.register(DailyPaymentSales)
+class SalesDashboardAdmin(admin.ModelAdmin):
+    """
+    The changelist is a read-only sales dashboard. Like /api/analytics/ it
+    reads the daily rollups only, so any range answers in a few queries.
+    """
+    change_list_template = 'admin/core/sales_dashboard.html'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        interval = request.GET.get('interval', 'day')
+        error = None
+        try:
+            start, end = analytics.date_range(request.GET)
+            report = {
+                'totals': analytics.summary(start, end),
+                'periods': analytics.report(start, end, interval),
+                'payment_methods': analytics.report(start, end, 'all', 'payment_method'),
+                'categories': analytics.report(start, end, 'all', 'category'),
+            }
+        except ValueError as e:
+            start = end = None
+            error, report = str(e), {}
+        context = {
+            **self.admin_site.each_context(request),
+            'title': "Sales",
+            'opts': self.model._meta,
+            'start': start,
+            'end': end,
+            'interval': interval,
+            'intervals': [name for name in analytics.INTERVALS if name != 'all'],
+            'error': error,
+            **report,
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, self.change_list_template, context)
@@ -0,0 +1,219 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek, TruncYear
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Category, DailyCategorySales, DailyPaymentSales, Order, OrderItem
+
+
+CENT = Decimal('0.01')
+
+# Rollup table and its key column per report grouping
+GROUPS = {
+    'category': (DailyCategorySales, 'category_id'),
+    'payment_method': (DailyPaymentSales, 'payment_method'),
+}
+
+# Period a report row covers; 'all' is one row per key for the whole range
+INTERVALS = {
+    'day': F,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'year': TruncYear,
+    'all': None,
+}
+
+
+def counted_orders():
+    """Orders that count as sales: placed and not failed."""
+    return Order.objects.filter(ordered=True).exclude(payment_status='failed')
+
+
+# ---------------------------------------------------------
+# TOTALS
+# ---------------------------------------------------------
+# {(date, key): [revenue, units, order_count]} for each grouping; the
+# incremental path and the backfill both reduce orders to these.
+def empty_totals():
+    return {group: defaultdict(lambda: [Decimal('0.00'), 0, 0]) for group in GROUPS}
+
+
+def order_totals(order, lines):
+    """Totals for one order from its (category_id, quantity, price) lines, without a query."""
+    day = timezone.localdate(order.ordered_at)
+    totals = empty_totals()
+    for category_id, quantity, price in lines:
+        row = totals['category'][day, category_id]
+        row[0] += price * quantity
+        row[1] += quantity
+    for row in totals['category'].values():
+        row[2] = 1
+    method = totals['payment_method'][day, order.payment_method]
+    method[0] = sum((row[0] for row in totals['category'].values()), Decimal('0.00'))
+    method[1] = sum(row[1] for row in totals['category'].values())
+    method[2] = 1
+    return totals
+
+
+def query_totals(orders):
+    """
+    Totals for a queryset of orders, one GROUP BY per grouping. Lines count
+    under the category recorded when the order was placed, as in add_order.
+    """
+    items = OrderItem.objects.filter(order__in=orders).annotate(day=TruncDate('order__ordered_at'))
+    subtotal = ExpressionWrapper(F('price') * F('quantity'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    totals = empty_totals()
+    for group, key in (('category', 'category_id'), ('payment_method', 'order__payment_method')):
+        rows = items.values('day', key).annotate(
+            revenue=Sum(subtotal), units=Sum('quantity'), orders=Count('order', distinct=True),
+        ).values_list('day', key, 'revenue', 'units', 'orders').order_by()
+        for day, value, revenue, units, count in rows:
+            totals[group][day, value] = [revenue.quantize(CENT), units, count]
+    return totals
+
+
+# ---------------------------------------------------------
+# INCREMENTAL MAINTENANCE
+# ---------------------------------------------------------
+# Called inside the transaction that places or fails the order, so the
+# rollups commit or roll back with it: one UPDATE per (day, key) touched,
+# an INSERT only for a day's first sale in a category or method.
+def add_order(order, lines):
+    apply_totals(order_totals(order, lines), 1)
+
+
+def remove_orders(order_ids):
+    """Take failed orders (previously counted) back out of the rollups."""
+    if order_ids:
+        apply_totals(query_totals(Order.objects.filter(pk__in=list(order_ids))), -1)
+
+
+def apply_totals(totals, sign):
+    for group, rows in totals.items():
+        model, key = GROUPS[group]
+        for (day, value), (revenue, units, count) in rows.items():
+            bump(model, {'date': day, key: value}, sign * revenue, sign * units, sign * count)
+
+
+def bump(model, lookup, revenue, units, count):
+    changes = {
+        'revenue': F('revenue') + revenue,
+        'units': F('units') + units,
+        'order_count': F('order_count') + count,
+    }
+    # A removal never creates a row: the order was counted before it existed
+    if model.objects.filter(**lookup).update(**changes) or count < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, revenue=revenue, units=units, order_count=count)
+    except IntegrityError:
+        # Another transaction created the day's row first
+        model.objects.filter(**lookup).update(**changes)
+
+
+# ---------------------------------------------------------
+# BACKFILL
+# ---------------------------------------------------------
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def rebuild_days(first, last):
+    """
+    Recompute the rollups for the days first..last (inclusive) from the
+    orders placed in them; returns the number of orders summarized.
+    """
+    orders = counted_orders().filter(
+        ordered_at__gte=day_start(first), ordered_at__lt=day_start(last + timedelta(days=1)),
+    )
+    with transaction.atomic():
+        totals = query_totals(orders)
+        for group, rows in totals.items():
+            model, key = GROUPS[group]
+            model.objects.filter(date__range=(first, last)).delete()
+            model.objects.bulk_create([
+                model(date=day, **{key: value}, revenue=revenue, units=units, order_count=count)
+                for (day, value), (revenue, units, count) in rows.items()
+            ], batch_size=1000)
+    return sum(row[2] for row in totals['payment_method'].values())
+
+
+def history_range():
+    """(first, last) local dates with orders, or None when there are none."""
+    placed = counted_orders().exclude(ordered_at=None).order_by('ordered_at').values_list('ordered_at', flat=True)
+    first, last = placed.first(), placed.last()
+    if first is None:
+        return None
+    return timezone.localdate(first), timezone.localdate(last)
+
+
+# ---------------------------------------------------------
+# REPORTS
+# ---------------------------------------------------------
+def date_range(params, days=30):
+    """(start, end) from ?start=&end= (YYYY-MM-DD); defaults to the last `days` days."""
+    end = parse_date(params['end']) if params.get('end') else timezone.localdate()
+    start = parse_date(params['start']) if params.get('start') else end and end - timedelta(days=days - 1)
+    if start is None or end is None:
+        raise ValueError("dates must be YYYY-MM-DD")
+    return start, end
+
+
+def report(start, end, interval='day', group_by=None):
+    """
+    Revenue, units and order count per period between two dates
+    (inclusive), optionally split by category or payment method.
+
+    Reads the rollups only: the cost follows the number of days and keys
+    in range, not the number of orders behind them. Ungrouped totals come
+    from the payment method table, where every order is counted once.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"interval must be one of {', '.join(INTERVALS)}")
+    if group_by and group_by not in GROUPS:
+        raise ValueError(f"group_by must be one of {', '.join(GROUPS)}")
+    if start > end:
+        raise ValueError("start is after end")
+
+    model, key = GROUPS[group_by or 'payment_method']
+    rows = model.objects.filter(date__range=(start, end))
+    keys = [key] if group_by else []
+    if INTERVALS[interval]:
+        rows = rows.annotate(period=INTERVALS[interval]('date'))
+        keys.insert(0, 'period')
+    elif not group_by:
+        return [summary(start, end)]
+    rows = rows.values(*keys).annotate(
+        total_revenue=Sum('revenue'), total_units=Sum('units'), total_orders=Sum('order_count'),
+    ).order_by(*(keys if INTERVALS[interval] else ['-total_revenue']))
+    slugs = dict(Category.objects.values_list('id', 'slug')) if group_by == 'category' else {}
+
+    results = []
+    for row in rows:
+        result = {'period': row['period']} if 'period' in row else {}
+        if group_by == 'category':
+            result['category'] = slugs.get(row[key])
+        elif group_by:
+            result[group_by] = row[key]
+        # SQLite sums decimals as floats; report whole cents
+        result.update(revenue=row['total_revenue'].quantize(CENT), units=row['total_units'], order_count=row['total_orders'])
+        results.append(result)
+    return results
+
+
+def summary(start, end):
+    """Totals for the whole range."""
+    totals = DailyPaymentSales.objects.filter(date__range=(start, end)).aggregate(
+        revenue=Sum('revenue'), units=Sum('units'), order_count=Sum('order_count'),
+    )
+    return {
+        'revenue': (totals['revenue'] or Decimal('0.00')).quantize(CENT),
+        'units': totals['units'] or 0,
+        'order_count': totals['order_count'] or 0,
+    }
@@ -1,12 +1,17 @@
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet, CategoryViewSet, create_checkout_session
+from .views import ProductViewSet, CategoryViewSet, OrderViewSet, create_checkout_session, checkout_cod, reserve_stock, stripe_webhook, sales_analytics
 from django.urls import path, include
 
 router = DefaultRouter()
 router.register(r'products', ProductViewSet, basename='product')
 router.register(r'categories', CategoryViewSet, basename='category')
+router.register(r'orders', OrderViewSet, basename='order')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('create-checkout-session/', create_checkout_session, name='create-checkout-session'),
+    path('checkout-cod/', checkout_cod, name='checkout-cod'),
+    path('reservations/', reserve_stock, name='reservations'),
+    path('stripe/webhook/', stripe_webhook, name='stripe-webhook'),
+    path('analytics/', sales_analytics, name='sales-analytics'),
 ]
@@ -0,0 +1,128 @@
+import gzip
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz variants are written
+    brotli = None
+
+
+# Text formats worth compressing; images and fonts already are
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.xml', '.html'}
+
+# (Content-Encoding, file suffix), best first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+# ---------------------------------------------------------
+# BUILD: collectstatic
+# ---------------------------------------------------------
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    `manage.py collectstatic` writes content-hashed copies of every asset
+    (css/base.abc123.css) plus staticfiles.json, and `{% static %}` links
+    the hashed names. Each hashed text asset also gets .gz and (when the
+    brotli package is installed) .br siblings, so serving never compresses
+    on the fly.
+    """
+    # Files in STATIC_ROOT that the manifest doesn't list get hashed on
+    # demand instead of failing the page
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in set(self.hashed_files.values()):
+            if os.path.splitext(hashed_name)[1] in COMPRESSIBLE_EXTENSIONS:
+                self.write_compressed(hashed_name)
+
+    def write_compressed(self, name):
+        with self.open(name) as f:
+            data = f.read()
+        variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(data, quality=11)
+        for suffix, compressed in variants.items():
+            path = self.path(name + suffix)
+            # Tiny files can grow; the server then falls back to the original
+            if len(compressed) < len(data):
+                with open(path, 'wb') as out:
+                    out.write(compressed)
+            elif os.path.exists(path):
+                os.remove(path)
+
+
+# ---------------------------------------------------------
+# SERVE: /static/<path>
+# ---------------------------------------------------------
+_hashed_names = None
+
+
+def is_hashed(path):
+    """True for names collectstatic fingerprinted; their content never changes."""
+    global _hashed_names
+    if _hashed_names is None:
+        _hashed_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+    return path in _hashed_names
+
+
+def accepted_encodings(header):
+    """Codings from Accept-Encoding, minus any the client refused with q=0."""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        refused = re.search(r'q\s*=\s*0(\.0*)?\s*$', params)
+        if coding and not refused:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def serve(request, path):
+    """
+    Serve a collected static file from STATIC_ROOT.
+
+    Picks the .br or .gz variant written at build time when the client
+    accepts it (Vary: Accept-Encoding keeps shared caches honest), and
+    marks fingerprinted names immutable for a year: a new build links new
+    names instead of changing these.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404(path)
+    if not os.path.isfile(fullpath):
+        raise Http404(path)
+
+    content_type, _ = mimetypes.guess_type(fullpath)
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    encoding = None
+    for coding, suffix in ENCODINGS:
+        if coding in accepted and os.path.isfile(fullpath + suffix):
+            encoding, fullpath = coding, fullpath + suffix
+            break
+
+    stat = os.stat(fullpath)
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(fullpath, 'rb'), content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Vary'] = 'Accept-Encoding'
+    response['Cache-Control'] = IMMUTABLE if is_hashed(path) else 'public, max-age=300'
+    return response
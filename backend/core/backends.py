@@ -1,8 +1,49 @@
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.functions import Lower
 
 User = get_user_model()
 
+
+# ---------------------------------------------------------
+# USER LOOKUPS
+# ---------------------------------------------------------
+def users_by_email(email):
+    """Case-insensitive email lookup served by the LOWER(email) index."""
+    return User.objects.alias(email_lower=Lower('email')).filter(email_lower=(email or '').lower())
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def get_cached_user(user_id):
+    """
+    The user with pk `user_id`, from the cache when possible.
+
+    Entries are dropped by the User save/delete signals, so a password
+    change (which rotates the session auth hash) is seen on the next request.
+    That only holds for a shared cache; with a per-process one
+    (settings.PER_PROCESS_CACHE) every lookup goes to the database.
+    """
+    if settings.PER_PROCESS_CACHE:
+        return User.objects.filter(pk=user_id).first()
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(key, user, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
 class EmailBackend(ModelBackend):
     """
     Authenticate using email instead of username
@@ -10,15 +51,11 @@ class EmailBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         if username is None:
             username = kwargs.get('email')
-        try:
-            user = User.objects.get(email=username)
-            if user.check_password(password):
-                return user
-        except User.DoesNotExist:
-            return None
+        user = users_by_email(username).order_by('pk').first()
+        if user is not None and user.check_password(password):
+            return user
+        return None
 
     def get_user(self, user_id):
-        try:
-            return User.objects.get(pk=user_id)
-        except User.DoesNotExist:
-            return None
+        user = get_cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -0,0 +1,292 @@
+import csv
+import gzip
+import json
+import os
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import search
+from .models import Category, Product
+
+
+# Columns of the interchange format; `category` is the category slug and
+# `image` a path under MEDIA_ROOT. Only `slug` is required on import.
+COLUMNS = ('slug', 'title', 'description', 'price', 'category', 'stock', 'image')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+FORMATS = ('csv', 'jsonl')
+
+
+class RowError(Exception):
+    """A row that can't be imported; it is skipped and reported."""
+
+
+# ---------------------------------------------------------
+# FILES
+# ---------------------------------------------------------
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    ext = os.path.splitext(name)[1].lstrip('.').lower()
+    return 'jsonl' if ext in ('jsonl', 'ndjson') else ext
+
+
+def open_text(path, mode):
+    """Open a file for text I/O, gzip-(de)compressing when it ends in .gz."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', compresslevel=6, encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def read_rows(f, fmt):
+    """Yield (line number, row dict) one at a time, however large the file."""
+    if fmt == 'csv':
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_num, line in enumerate(f, 1):
+        if line.strip():
+            try:
+                yield line_num, json.loads(line)
+            except ValueError as e:
+                yield line_num, RowError(f"invalid JSON: {e}")
+
+
+class RowWriter:
+    def __init__(self, f, fmt):
+        self.f, self.fmt = f, fmt
+        if fmt == 'csv':
+            self.csv = csv.writer(f)
+            self.csv.writerow(COLUMNS)
+
+    def write(self, row):
+        if self.fmt == 'csv':
+            self.csv.writerow(['' if row[c] is None else row[c] for c in COLUMNS])
+        else:
+            self.f.write(json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+
+# ---------------------------------------------------------
+# CHECKPOINTS
+# ---------------------------------------------------------
+# {"source": ..., "rows": N}: the first N data rows are committed. Written
+# after each batch commits (tmp file + rename), so a crash loses at most
+# the batch in flight and --resume re-applies nothing twice.
+def read_checkpoint(path, source):
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return 0
+    if state.get('source') != os.path.abspath(source):
+        raise ValueError(f"Checkpoint {path} belongs to {state.get('source')}")
+    return state['rows']
+
+
+def write_checkpoint(path, source, rows):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'source': os.path.abspath(source), 'rows': rows}, f)
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------
+# IMAGES
+# ---------------------------------------------------------
+def normalize(name):
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def compact(name):
+    return re.sub(r'[^a-z0-9]+', '', name.lower())
+
+
+class ImageLibrary:
+    """
+    Images under MEDIA_ROOT/<folder>/, indexed once by file stem with the
+    punctuation dropped.
+
+    A category uses the longest folder whose name prefixes its normalized
+    slug ("home-&-kitchen" -> home_kitchen/, "beauty-&-personal-care" ->
+    beauty/). A product takes the file whose stem is the longest run of its
+    slug ("samsung-galaxy-s23-ultra" -> galaxys23ultra.jpg), found with
+    dictionary lookups so the cost doesn't grow with the folder.
+    """
+    min_stem = 5
+
+    def __init__(self, root=None):
+        self.root = str(root or settings.MEDIA_ROOT)
+        self.folders = {}
+        if os.path.isdir(self.root):
+            for entry in os.scandir(self.root):
+                if entry.is_dir() and entry.name != 'variants':
+                    self.folders[entry.name] = {
+                        compact(os.path.splitext(f.name)[0]): f'{entry.name}/{f.name}'
+                        for f in os.scandir(entry.path)
+                        if f.is_file() and f.name.lower().endswith(IMAGE_EXTENSIONS)
+                    }
+        self.category_folders = {}
+
+    def folder_for(self, category_slug):
+        if category_slug not in self.category_folders:
+            key = normalize(category_slug)
+            matches = [
+                name for name in self.folders
+                if key == normalize(name) or key.startswith(normalize(name) + '_')
+            ]
+            self.category_folders[category_slug] = max(matches, key=len) if matches else None
+        return self.category_folders[category_slug]
+
+    def exists(self, name):
+        return os.path.isfile(os.path.join(self.root, name))
+
+    def find(self, category_slug, product_slug):
+        folder = self.folder_for(category_slug) if category_slug else None
+        if folder is None:
+            return None
+        images, key = self.folders[folder], compact(product_slug)
+        for length in range(len(key), self.min_stem - 1, -1):
+            for start in range(len(key) - length + 1):
+                name = images.get(key[start:start + length])
+                if name:
+                    return name
+        return None
+
+
+# ---------------------------------------------------------
+# IMPORT
+# ---------------------------------------------------------
+class CatalogImporter:
+    """
+    Upsert products by slug from a stream of rows, `batch_size` at a time.
+
+    Each batch is one transaction: one SELECT of the existing slugs, one
+    upserting bulk_create and a search re-index of just those rows.
+    Categories are resolved from a slug -> id map loaded once. Memory holds
+    one batch, whatever the file size.
+    """
+
+    def __init__(self, create_categories=False, images=None):
+        self.create_categories = create_categories
+        self.images = images or ImageLibrary()
+        self.categories = dict(Category.objects.values_list('slug', 'id'))
+        self.category_slugs = {pk: slug for slug, pk in self.categories.items()}
+        self.created = self.updated = self.incomplete = self.images_attached = 0
+
+    def category_id(self, slug):
+        if slug in self.categories:
+            return self.categories[slug]
+        if not self.create_categories:
+            raise RowError(f"unknown category {slug!r}")
+        category = Category.objects.create(name=slug.replace('-', ' ').title(), slug=slug)
+        self.categories[slug] = category.pk
+        self.category_slugs[category.pk] = slug
+        return category.pk
+
+    def clean(self, row):
+        """Row dict -> {field: value} for the columns present (empty CSV cells are absent)."""
+        if isinstance(row, RowError):
+            raise row
+        if not isinstance(row, dict):
+            raise RowError("row is not an object")
+        values = {k: v for k, v in row.items() if k in COLUMNS and v not in ('', None)}
+        slug = str(values.get('slug', '')).strip()
+        if not slug:
+            raise RowError("missing slug")
+        fields = {'slug': slug}
+        for name in ('title', 'description'):
+            if name in values:
+                fields[name] = str(values[name])
+        if 'price' in values:
+            try:
+                fields['price'] = Decimal(str(values['price'])).quantize(Decimal('0.01'))
+            except InvalidOperation:
+                raise RowError(f"invalid price {values['price']!r}")
+        if 'stock' in values:
+            try:
+                fields['stock'] = int(values['stock'])
+            except (TypeError, ValueError):
+                raise RowError(f"invalid stock {values['stock']!r}")
+            if fields['stock'] < 0:
+                raise RowError("stock can't be negative")
+        if 'category' in values:
+            fields['category_id'] = self.category_id(str(values['category']).strip())
+        if 'image' in values:
+            if not self.images.exists(str(values['image'])):
+                raise RowError(f"image {values['image']!r} not found under MEDIA_ROOT")
+            fields['image'] = str(values['image'])
+        return fields
+
+    # Product columns an import can set
+    FIELDS = ('title', 'description', 'price', 'category_id', 'stock', 'image')
+
+    def import_batch(self, batch):
+        """
+        Apply a list of cleaned rows (later rows win on duplicate slugs).
+
+        Existing rows are read once so partial rows keep their other
+        columns, then the whole batch is written with a single
+        INSERT ... ON CONFLICT(slug) DO UPDATE.
+        """
+        rows = {fields['slug']: fields for fields in batch}
+        now = timezone.now()
+        with transaction.atomic():
+            existing = {
+                row['slug']: row
+                for row in Product.objects.filter(slug__in=list(rows)).values('slug', *self.FIELDS)
+            }
+            products, updated_columns = [], {'updated_at'}
+            for slug, fields in rows.items():
+                current = existing.get(slug)
+                if current is None and ('title' not in fields or 'price' not in fields):
+                    self.incomplete += 1
+                    continue
+                product = Product(**{**(current or {}), **fields}, updated_at=now)
+                if current is not None:
+                    updated_columns.update(fields)
+                if not product.image:
+                    self.attach_image(product)
+                    if product.image:
+                        updated_columns.add('image')
+                products.append(product)
+            Product.objects.bulk_create(
+                products,
+                update_conflicts=True,
+                unique_fields=['slug'],
+                update_fields=sorted(
+                    'category' if name == 'category_id' else name
+                    for name in updated_columns - {'slug'}
+                ),
+            )
+            if search.is_enabled():
+                search.index_products_by_slug(p.slug for p in products)
+        self.updated += sum(1 for p in products if p.slug in existing)
+        self.created += sum(1 for p in products if p.slug not in existing)
+
+    def attach_image(self, product):
+        name = self.images.find(self.category_slugs.get(product.category_id), product.slug)
+        if name:
+            product.image = name
+            self.images_attached += 1
+
+
+# ---------------------------------------------------------
+# EXPORT
+# ---------------------------------------------------------
+def export_rows(chunk_size):
+    """Every product as an interchange row, streamed in id order."""
+    categories = dict(Category.objects.values_list('id', 'slug'))
+    rows = (
+        Product.objects.order_by('pk')
+        .values_list('slug', 'title', 'description', 'price', 'category_id', 'stock', 'image')
+        .iterator(chunk_size=chunk_size)
+    )
+    for slug, title, description, price, category_id, stock, image in rows:
+        yield {
+            'slug': slug, 'title': title, 'description': description,
+            'price': str(price), 'category': categories.get(category_id),
+            'stock': stock, 'image': image or None,
+        }
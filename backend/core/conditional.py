@@ -0,0 +1,58 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from . import page_cache
+
+
+# ---------------------------------------------------------
+# CONDITIONAL GET (ETag / Last-Modified)
+# ---------------------------------------------------------
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified validators for read-only catalog viewsets.
+
+    Both come from the catalog version row (core.page_cache), which every
+    Product/Category save or delete and every bulk catalog command bumps:
+    one primary-key lookup per request, whatever the size of the catalog
+    or the depth of the page. That also covers deletes and the fields
+    rendered from related rows (a product's category_slug). A matching
+    If-None-Match / If-Modified-Since gets a 304 before anything is
+    serialized. Last-Modified only has one-second resolution; the ETag,
+    always sent alongside it, is exact.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(
+            request,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(
+            request,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+        )
+
+    def conditional(self, request, get_response):
+        version, last_modified = page_cache.get_catalog_state()
+        etag = self.make_etag(request, version)
+        timestamp = int(last_modified.timestamp())
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp,
+        )
+        response = not_modified or get_response()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(timestamp)
+            patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def make_etag(self, request, version):
+        # Same catalog renders differently per URL (cursor, search, page size)
+        # and per negotiated format (JSON vs browsable API)
+        renderer = getattr(request, 'accepted_renderer', None)
+        parts = [request.get_full_path(), getattr(renderer, 'format', ''), str(version)]
+        return quote_etag(hashlib.md5('|'.join(parts).encode()).hexdigest())
@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Max, Min, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from .models import Category, CategoryStats, Product
+
+
+# ---------------------------------------------------------
+# INCREMENTAL MAINTENANCE
+# ---------------------------------------------------------
+# A product save or delete touches one or two CategoryStats rows with a
+# single UPDATE each. Only when the cheapest or dearest product leaves a
+# category (or moves its price inward) is that bound re-read, and that is
+# one seek on the (category, price, id) index, not a scan.
+def product_changed(before, after, when=None):
+    """
+    Apply one product change to the summary.
+
+    `before` and `after` are the product's (category_id, price) before and
+    after the change, or None when it wasn't in a category (or didn't exist).
+    """
+    when = when or timezone.now()
+    with transaction.atomic():
+        if before and after and before[0] == after[0]:
+            touch(after[0], after[1], 0, when)
+            if before[1] != after[1]:
+                shrink(before[0], before[1])
+            return
+        if before:
+            touch(before[0], None, -1, when)
+            shrink(before[0], before[1])
+        if after:
+            touch(after[0], after[1], 1, when)
+
+
+def touch(category_id, price, delta, when):
+    price_value = Value(price, output_field=DecimalField(max_digits=10, decimal_places=2))
+    fields = {'last_product_update': Greatest(Coalesce('last_product_update', Value(when)), Value(when))}
+    if delta:
+        fields['product_count'] = F('product_count') + delta
+    if price is not None:
+        fields['min_price'] = Least(Coalesce('min_price', price_value), price_value)
+        fields['max_price'] = Greatest(Coalesce('max_price', price_value), price_value)
+    if not CategoryStats.objects.filter(pk=category_id).update(**fields):
+        refresh(category_id)
+
+
+def shrink(category_id, price):
+    """Re-read a price bound that `price` (now gone from the category) may have held."""
+    bounds = CategoryStats.objects.filter(pk=category_id).values('min_price', 'max_price').first()
+    if not bounds:
+        return
+    prices = Product.objects.filter(category_id=category_id).values_list('price', flat=True)
+    fields = {}
+    if bounds['min_price'] is not None and price <= bounds['min_price']:
+        fields['min_price'] = prices.order_by('price').first()
+    if bounds['max_price'] is not None and price >= bounds['max_price']:
+        fields['max_price'] = prices.order_by('-price').first()
+    if fields:
+        CategoryStats.objects.filter(pk=category_id).update(**fields)
+
+
+# ---------------------------------------------------------
+# FULL REBUILD
+# ---------------------------------------------------------
+def summarize(categories):
+    return categories.annotate(
+        count=Count('product'),
+        low=Min('product__price'),
+        high=Max('product__price'),
+        latest=Max('product__updated_at'),
+    ).values_list('pk', 'count', 'low', 'high', 'latest')
+
+
+def stats_rows(categories):
+    return [
+        CategoryStats(category_id=pk, product_count=count, min_price=low, max_price=high, last_product_update=latest)
+        for pk, count, low, high, latest in summarize(categories)
+    ]
+
+
+def refresh(category_id):
+    """Recompute one category's row from scratch (e.g. it was missing)."""
+    for row in stats_rows(Category.objects.filter(pk=category_id)):
+        CategoryStats.objects.update_or_create(
+            category_id=category_id,
+            defaults={f: getattr(row, f) for f in ('product_count', 'min_price', 'max_price', 'last_product_update')},
+        )
+
+
+def rebuild():
+    """Recompute every row with one GROUP BY pass; returns the number of categories."""
+    with transaction.atomic():
+        CategoryStats.objects.all().delete()
+        return len(CategoryStats.objects.bulk_create(stats_rows(Category.objects.all()), batch_size=1000))
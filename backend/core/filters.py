@@ -0,0 +1,21 @@
+from rest_framework.filters import BaseFilterBackend
+
+
+# ---------------------------------------------------------
+# API: ?category= FILTER
+# ---------------------------------------------------------
+class ProductCategoryFilter(BaseFilterBackend):
+    """
+    ?category=<slug> restricts products to one category.
+
+    The slug is matched through the join on the unique category slug, so
+    SQLite resolves it first and then walks the (category_id, ...) index
+    that matches the page ordering.
+    """
+    category_param = 'category'
+
+    def filter_queryset(self, request, queryset, view):
+        slug = request.query_params.get(self.category_param, '').strip()
+        if not slug:
+            return queryset
+        return queryset.filter(category__slug=slug)
@@ -0,0 +1,160 @@
+import io
+import json
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+
+# ---------------------------------------------------------
+# RESPONSIVE IMAGE VARIANTS
+# ---------------------------------------------------------
+# media/electronics/iphone.jpg
+#   -> media/variants/electronics/iphone-320w.webp
+#   -> media/variants/electronics/iphone-320w.jpg  (...one pair per width)
+#   -> media/variants/electronics/iphone.json      (widths actually written)
+VARIANT_DIR = 'variants'
+VARIANT_WIDTHS = (160, 320, 640)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+FORMAT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def variant_name(name, width, fmt):
+    base, _ = posixpath.splitext(name)
+    return f'{VARIANT_DIR}/{base}-{width}w.{FORMAT_EXTENSIONS[fmt]}'
+
+
+def manifest_name(name):
+    base, _ = posixpath.splitext(name)
+    return f'{VARIANT_DIR}/{base}.json'
+
+
+def generate_variants(name, force=False):
+    """
+    Write every width/format variant of the stored image `name`.
+
+    Widths are capped at the original's width (no upscaling), so a small
+    original still gets a full-size compressed variant. Existing variants
+    are kept unless `force` is set. Returns the number of files written.
+    """
+    if not name or not default_storage.exists(name):
+        return 0
+    if not force and default_storage.exists(manifest_name(name)):
+        return 0
+
+    with default_storage.open(name, 'rb') as fh:
+        original = ImageOps.exif_transpose(Image.open(fh))
+        original.load()
+
+    if original.mode not in ('RGB', 'L'):
+        background = Image.new('RGB', original.size, 'white')
+        background.paste(original, mask=original.convert('RGBA').getchannel('A'))
+        original = background
+    elif original.mode == 'L':
+        original = original.convert('RGB')
+
+    widths = sorted({min(width, original.width) for width in VARIANT_WIDTHS})
+    written = 0
+    for width in widths:
+        height = round(original.height * width / original.width)
+        resized = original.resize((width, height), Image.LANCZOS)
+        for fmt, (pil_format, options) in VARIANT_FORMATS.items():
+            buf = io.BytesIO()
+            resized.save(buf, pil_format, **options)
+            _write(variant_name(name, width, fmt), buf.getvalue())
+            written += 1
+
+    _write(manifest_name(name), json.dumps({'widths': widths}).encode())
+    return written
+
+
+def _write(target, content):
+    if default_storage.exists(target):
+        default_storage.delete(target)
+    default_storage.save(target, ContentFile(content))
+
+
+# Parsed manifests and the variant URLs and srcsets built from them, per
+# process; the serializers, the srcset template filter and checkout all
+# read them from here. Each lookup still stats the manifest and re-reads
+# it when its modification time moved (variants regenerated by another
+# process), but a page of products no longer opens and parses a JSON
+# file, and builds six URLs, per image.
+_manifests = {}
+MANIFEST_CACHE_SIZE = 10_000
+NO_VARIANTS = ({fmt: [] for fmt in VARIANT_FORMATS}, {fmt: '' for fmt in VARIANT_FORMATS})
+
+
+def _manifest(name):
+    """({format: [(width, url)]}, {format: srcset}) for `name`, empty without variants."""
+    manifest = manifest_name(name)
+    try:
+        modified = default_storage.get_modified_time(manifest)
+    except OSError:
+        return NO_VARIANTS
+    cached = _manifests.get(name)
+    if cached and cached[0] == modified:
+        return cached[1]
+    try:
+        with default_storage.open(manifest, 'rb') as fh:
+            widths = json.load(fh)['widths']
+    except (OSError, ValueError, KeyError):
+        return NO_VARIANTS
+    variants = {
+        fmt: [(width, default_storage.url(variant_name(name, width, fmt))) for width in widths]
+        for fmt in VARIANT_FORMATS
+    }
+    srcsets = {
+        fmt: ', '.join(f'{url} {width}w' for width, url in urls)
+        for fmt, urls in variants.items()
+    }
+    if len(_manifests) >= MANIFEST_CACHE_SIZE:
+        _manifests.clear()
+    _manifests[name] = (modified, (variants, srcsets))
+    return variants, srcsets
+
+
+def variant_widths(name):
+    return [width for width, _ in _manifest(name)[0]['jpeg']]
+
+
+def available_variants(name, fmt):
+    """[(width, url)] for the generated variants of `name`, narrowest first."""
+    if not name:
+        return []
+    return _manifest(name)[0].get(fmt, [])
+
+
+def srcset(name, fmt):
+    return srcsets(name).get(fmt, '') if name else ''
+
+
+def srcsets(name):
+    """{format: srcset} for every variant format, from one cached manifest lookup."""
+    return _manifest(name)[1]
+
+
+def best_variant_url(name, min_width, fmt='jpeg'):
+    """
+    URL of the smallest variant at least `min_width` wide, falling back to
+    the largest one available; None when no variants exist.
+    """
+    variants = available_variants(name, fmt)
+    if not variants:
+        return None
+    for width, url in variants:
+        if width >= min_width:
+            return url
+    return variants[-1][1]
+
+
+def name_from_url(url):
+    """Storage name for a /media/... URL (as sent back by the cart), else None."""
+    if url and url.startswith(settings.MEDIA_URL):
+        return url[len(settings.MEDIA_URL):]
+    return None
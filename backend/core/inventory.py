@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import jobs
+from .models import Product, StockReservation
+
+
+class OutOfStock(Exception):
+    """Not enough units of one or more products."""
+
+    def __init__(self, product_ids):
+        self.product_ids = sorted(product_ids)
+        super().__init__(f"Out of stock: {', '.join(map(str, self.product_ids))}")
+
+
+# ---------------------------------------------------------
+# STOCK COUNTERS
+# ---------------------------------------------------------
+# Every change is one conditional UPDATE per product: the row lock is held
+# for a single statement instead of a SELECT ... FOR UPDATE round trip, and
+# `stock >= qty` in the WHERE clause is what makes overselling impossible.
+def take_stock(quantities):
+    """
+    Decrement stock for {product_id: qty}, all or nothing.
+
+    Must run inside a transaction; raising OutOfStock rolls back the units
+    already taken. Products are updated in id order so two carts never
+    wait on each other's rows in opposite order. Untracked products
+    (stock is NULL) always succeed.
+    """
+    now = timezone.now()
+    short = []
+    for product_id in sorted(quantities):
+        qty = quantities[product_id]
+        taken = Product.objects.filter(pk=product_id, stock__gte=qty).update(
+            stock=F('stock') - qty, updated_at=now,
+        )
+        if not taken:
+            short.append(product_id)
+    if short:
+        # Rows with no stock column set aren't short, just untracked
+        untracked = set(
+            Product.objects.filter(pk__in=short, stock__isnull=True).values_list('pk', flat=True)
+        )
+        short = [pk for pk in short if pk not in untracked]
+        if short:
+            raise OutOfStock(short)
+
+
+def return_stock(quantities):
+    now = timezone.now()
+    for product_id in sorted(quantities):
+        Product.objects.filter(pk=product_id, stock__isnull=False).update(
+            stock=F('stock') + quantities[product_id], updated_at=now,
+        )
+
+
+# ---------------------------------------------------------
+# RESERVATIONS
+# ---------------------------------------------------------
+def reserve(user, quantities, hold=None):
+    """
+    Hold stock for `user` for `hold` seconds (STOCK_RESERVATION_SECONDS).
+
+    Returns the StockReservation rows. Units come out of Product.stock now,
+    so other shoppers can't buy them; an expiry job puts them back unless
+    the reservations are converted into an order first.
+    """
+    hold = hold or settings.STOCK_RESERVATION_SECONDS
+    expires_at = timezone.now() + timedelta(seconds=hold)
+    with transaction.atomic():
+        take_stock(quantities)
+        reservations = StockReservation.objects.bulk_create([
+            StockReservation(user=user, product_id=pid, quantity=qty, expires_at=expires_at)
+            for pid, qty in quantities.items()
+        ])
+        schedule_release(delay=hold + 1)
+    return reservations
+
+
+def schedule_release(delay):
+    """Keep one pending expiry sweep, however many reservations are made."""
+    jobs.enqueue_once('core.tasks.release_expired_reservations', delay=delay)
+
+
+def convert(user, reservation_ids, order):
+    """
+    Attach active, unexpired reservations of `user` to `order`.
+
+    Returns {product_id: qty} of the converted units; an id that is
+    missing, expired or already used is simply not included.
+    """
+    reservations = list(
+        StockReservation.objects.select_for_update().filter(
+            pk__in=reservation_ids, user=user,
+            status=StockReservation.ACTIVE, expires_at__gt=timezone.now(),
+        )
+    )
+    StockReservation.objects.filter(pk__in=[r.pk for r in reservations]).update(
+        status=StockReservation.CONVERTED, order=order,
+    )
+    quantities = {}
+    for reservation in reservations:
+        quantities[reservation.product_id] = quantities.get(reservation.product_id, 0) + reservation.quantity
+    return quantities
+
+
+def release_expired(now=None):
+    """Give the units of expired reservations back; returns how many were released."""
+    now = now or timezone.now()
+    expired = StockReservation.objects.filter(status=StockReservation.ACTIVE, expires_at__lte=now)
+    released = 0
+    for reservation in expired.only('pk', 'product_id', 'quantity'):
+        with transaction.atomic():
+            # The status check makes a second sweep (or a racing convert) a no-op
+            if StockReservation.objects.filter(
+                pk=reservation.pk, status=StockReservation.ACTIVE,
+            ).update(status=StockReservation.RELEASED):
+                return_stock({reservation.product_id: reservation.quantity})
+                released += 1
+
+    # The single queued sweep may have been scheduled for an earlier
+    # reservation; queue the next one for whatever is still held
+    next_expiry = (
+        StockReservation.objects.filter(status=StockReservation.ACTIVE)
+        .order_by('expires_at').values_list('expires_at', flat=True).first()
+    )
+    if next_expiry:
+        schedule_release(delay=max(0, (next_expiry - now).total_seconds()) + 1)
+    return released
@@ -0,0 +1,111 @@
+import logging
+import random
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger('core.jobs')
+
+
+# ---------------------------------------------------------
+# ENQUEUE
+# ---------------------------------------------------------
+def enqueue(task, payload=None, delay=0, max_attempts=None):
+    """
+    Queue `task` (dotted path of a callable taking the payload dict).
+
+    Called inside a transaction, the job is committed or rolled back with
+    it, so a job never refers to an order that doesn't exist.
+    """
+    return Job.objects.create(
+        task=task,
+        payload=payload or {},
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def enqueue_once(task, payload=None, delay=0):
+    """
+    Queue `task` unless a run of it is already waiting.
+
+    For drain-style tasks that process whatever has piled up: a burst of
+    triggers collapses into one queued job. A job that is already RUNNING
+    doesn't count, so work arriving mid-run still gets picked up.
+    """
+    if Job.objects.filter(task=task, status=Job.QUEUED).exists():
+        return None
+    return enqueue(task, payload, delay)
+
+
+# ---------------------------------------------------------
+# CLAIM / RUN
+# ---------------------------------------------------------
+def claim(limit, visibility_timeout):
+    """
+    Lease up to `limit` due jobs to a new worker token and return them.
+
+    A job whose lease ran out (its worker died or hung) is due again. The
+    claim is one UPDATE ... WHERE id IN (SELECT ... LIMIT n) that re-checks
+    `due` on every row, so two workers never lease the same job and no
+    read lock has to be upgraded to a write lock midway.
+    """
+    now = timezone.now()
+    due = (
+        Q(status=Job.QUEUED, run_at__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+    candidates = Job.objects.filter(due).order_by('run_at').values('pk')[:limit]
+    token = uuid.uuid4().hex
+    claimed = Job.objects.filter(due, pk__in=candidates).update(
+        status=Job.RUNNING,
+        locked_by=token,
+        locked_until=now + timedelta(seconds=visibility_timeout),
+        attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        return []
+    return list(Job.objects.filter(status=Job.RUNNING, locked_by=token))
+
+
+def backoff(attempts):
+    """Exponential retry delay, jittered to 50-100%, capped at JOB_MAX_BACKOFF."""
+    ceiling = min(settings.JOB_MAX_BACKOFF, settings.JOB_BASE_BACKOFF * 2 ** (attempts - 1))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def run(job):
+    """
+    Run a claimed job and record the outcome.
+
+    Success deletes the job. A failure re-queues it after backoff() until
+    max_attempts, then leaves it FAILED for inspection. Outcomes are only
+    written while this worker still holds the lease.
+    """
+    leased = Job.objects.filter(pk=job.pk, locked_by=job.locked_by)
+    try:
+        import_string(job.task)(job.payload)
+    except Exception as e:
+        error = ''.join(traceback.format_exception(e))
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s (%s) failed permanently: %s", job.pk, job.task, e)
+            leased.update(status=Job.FAILED, last_error=error, locked_by='', locked_until=None)
+        else:
+            delay = backoff(job.attempts)
+            logger.warning("Job %s (%s) failed, retry in %.0fs: %s", job.pk, job.task, delay, e)
+            leased.update(
+                status=Job.QUEUED, last_error=error, locked_by='', locked_until=None,
+                run_at=timezone.now() + timedelta(seconds=delay),
+            )
+        return False
+    if not leased.delete()[0]:
+        # Ran past its visibility timeout; another worker may run it again
+        logger.warning("Job %s (%s) finished after its lease expired", job.pk, job.task)
+    return True
@@ -0,0 +1,68 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from core.models import Product
+from core.serializers import ProductSerializer, ProductValuesSerializer
+
+
+class Command(BaseCommand):
+    help = "Benchmark product list serialization (ms per 1,000 products), DRF vs .values() fast path."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Products per run (capped by catalog size).")
+        parser.add_argument('--repeat', type=int, default=7, help="Runs per case; the median is reported.")
+        parser.add_argument('--fields', default='id,title,price', help="Sparse fieldset to compare.")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON.")
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        sparse = options['fields'].split(',')
+        request = Request(RequestFactory().get('/api/products/', HTTP_HOST='localhost'))
+        context = {'request': request}
+
+        queryset = Product.objects.order_by('-created_at', '-id')[:rows]
+        count = queryset.count()
+        if not count:
+            self.stderr.write("No products to serialize; load fixtures or generate a catalog first.")
+            return
+
+        def drf(fields=None):
+            qs = queryset if fields is None else queryset.only(*ProductValuesSerializer(fields=fields).db_fields)
+            return ProductSerializer(list(qs), many=True, fields=fields, context=context).data
+
+        def values(fields=None):
+            serializer = ProductValuesSerializer(fields=fields, context=context)
+            return serializer.serialize(queryset.values(*serializer.db_fields))
+
+        cases = [
+            ('ModelSerializer, all fields (before)', lambda: drf()),
+            ('ModelSerializer + only(), ?fields', lambda: drf(sparse)),
+            ('values() fast path, all fields', lambda: values()),
+            ('values() fast path, ?fields', lambda: values(sparse)),
+        ]
+
+        results = []
+        for label, run in cases:
+            run()  # warm-up
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+            per_1000 = statistics.median(timings) * 1000 * 1000 / count
+            results.append({'case': label, 'rows': count, 'ms_per_1000': round(per_1000, 2)})
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        baseline = results[0]['ms_per_1000']
+        self.stdout.write(f"{count} products, median of {repeat} runs, sparse fields = {','.join(sparse)}")
+        for result in results:
+            speedup = baseline / result['ms_per_1000'] if result['ms_per_1000'] else 0
+            self.stdout.write(f"  {result['case']:<40} {result['ms_per_1000']:>9.2f} ms/1000  ({speedup:.1f}x)")
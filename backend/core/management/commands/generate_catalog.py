@@ -0,0 +1,268 @@
+import bisect
+import itertools
+import math
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core import analytics, facets, page_cache, search
+from core.models import Category, Order, OrderItem, Product
+
+
+ADJECTIVES = (
+    'classic', 'pro', 'ultra', 'mini', 'smart', 'wireless', 'organic', 'premium',
+    'travel', 'compact', 'deluxe', 'sport', 'eco', 'studio', 'vintage', 'digital',
+)
+NOUNS = (
+    'headphones', 'backpack', 'jacket', 'blender', 'lamp', 'watch', 'sneakers', 'kettle',
+    'notebook', 'speaker', 'camera', 'chair', 'bottle', 'charger', 'mug', 'novel',
+)
+CITIES = ('Mumbai', 'Delhi', 'Bengaluru', 'Chennai', 'Hyderabad', 'Pune', 'Kolkata', 'Jaipur')
+STATES = ('Maharashtra', 'Delhi', 'Karnataka', 'Tamil Nadu', 'Telangana', 'West Bengal', 'Rajasthan')
+
+
+class WeightedPicker:
+    """O(log n) weighted choice over a fixed population (cumulative weights + bisect)."""
+
+    def __init__(self, rng, population, weights):
+        self.rng = rng
+        self.population = population
+        self.cumulative = list(itertools.accumulate(weights))
+        self.total = self.cumulative[-1]
+
+    def pick(self):
+        return self.population[bisect.bisect(self.cumulative, self.rng.random() * self.total)]
+
+
+def zipf_weights(n, s=1.1):
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+
+@contextmanager
+def explicit_timestamps(model):
+    """Let bulk_create keep the created_at/updated_at we set instead of auto_now(_add) stamping now."""
+    fields = [
+        f for f in model._meta.concrete_fields
+        if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)
+    ]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic catalog and order history (categories, products, users, "
+        "orders, order items) with batched bulk_create. Seedable and repeatable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=40)
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--orders', type=int, default=200_000)
+        parser.add_argument('--max-items', type=int, default=8, help="Max distinct products per order.")
+        parser.add_argument('--days', type=int, default=730, help="Spread orders over this many past days.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per bulk_create call.")
+        parser.add_argument('--chunk-size', type=int, default=50_000,
+                            help="Rows per transaction (several bulk_create batches).")
+        parser.add_argument('--password', default=None,
+                            help="Give every generated user this password (hashed once). Default: unusable.")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.chunk_size = options['chunk_size']
+        self.now = timezone.now()
+        started = time.perf_counter()
+
+        categories = self.generate_categories(options['categories'])
+        product_ids, products = self.generate_products(options['products'], categories)
+        user_ids = self.generate_users(options['users'], options['password'])
+        self.generate_orders(options['orders'], user_ids, product_ids, products,
+                             options['max_items'], options['days'])
+        if options['orders']:
+            # Bulk-inserted orders bypass place_order's rollup updates
+            first = timezone.localdate(self.now - timedelta(days=options['days']))
+            self.timed("sales rollups", analytics.rebuild_days, first, timezone.localdate(self.now))
+
+        if search.is_enabled():
+            self.timed("search index", search.rebuild_index)
+        self.timed("category stats", facets.rebuild)
+        page_cache.bump_catalog_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {time.perf_counter() - started:.1f}s"
+        ))
+
+    # ---------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------
+    def timed(self, label, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - started
+        rows = len(result) if isinstance(result, list) else result
+        rate = f" ({rows / elapsed:,.0f} rows/s)" if rows and elapsed else ""
+        self.stdout.write(f"  {label}: {elapsed:.1f}s{rate}")
+        return result
+
+    def insert(self, model, objects, keep):
+        """
+        bulk_create an iterable in chunked transactions. Only `keep(obj)` of
+        each created row is returned; the instances themselves are dropped
+        chunk by chunk, so memory doesn't grow with millions of rows.
+        """
+        kept = []
+        iterator = iter(objects)
+        while True:
+            chunk = list(itertools.islice(iterator, self.chunk_size))
+            if not chunk:
+                return kept
+            with transaction.atomic():
+                kept += map(keep, model.objects.bulk_create(chunk, batch_size=self.batch_size))
+
+    def random_past(self, days):
+        # sqrt skews towards recent dates, like a growing shop
+        return self.now - timedelta(days=days * (1 - math.sqrt(self.rng.random())))
+
+    # ---------------------------------------------------------
+    # Generators
+    # ---------------------------------------------------------
+    def generate_categories(self, count):
+        offset = Category.objects.count()
+        categories = self.insert(Category, (
+            Category(name=f'{self.rng.choice(ADJECTIVES).title()} {self.rng.choice(NOUNS).title()} {offset + i}',
+                     slug=f'gen-category-{offset + i}')
+            for i in range(count)
+        ), keep=lambda c: c)
+        self.stdout.write(f"  categories: {len(categories)}")
+        return categories
+
+    def generate_products(self, count, categories):
+        if not count:
+            return [], {}
+        if not categories:
+            categories = list(Category.objects.all())
+        if not categories:
+            raise CommandError("Products need at least one category")
+
+        rng = self.rng
+        offset = Product.objects.count()
+        # A few large categories and a long tail; each with its own price level
+        category_picker = WeightedPicker(rng, categories, zipf_weights(len(categories), 0.8))
+        price_level = {c.pk: rng.uniform(math.log(8), math.log(600)) for c in categories}
+
+        def build():
+            for i in range(count):
+                category = category_picker.pick()
+                created = self.random_past(1000)
+                price = Decimal(min(math.exp(rng.gauss(price_level[category.pk], 0.6)), 99_999)).quantize(Decimal('0.01'))
+                words = rng.sample(ADJECTIVES, 2) + [rng.choice(NOUNS)]
+                yield Product(
+                    title=f"{' '.join(words).title()} {offset + i}",
+                    slug=f'gen-product-{offset + i}',
+                    description=' '.join(rng.choices(ADJECTIVES + NOUNS, k=rng.randint(15, 60))),
+                    price=price,
+                    category=category,
+                    created_at=created,
+                    updated_at=created,
+                )
+
+        with explicit_timestamps(Product):
+            products = dict(self.timed("products", lambda: self.insert(
+                Product, build(), keep=lambda p: (p.pk, (p.price, p.category_id)),
+            )))
+        return list(products), products
+
+    def generate_users(self, count, password):
+        if not count:
+            return []
+        offset = User.objects.count()
+        password_hash = make_password(password)  # hashed once, shared by all rows
+
+        users = self.timed("users", lambda: self.insert(User, (
+            User(username=f'user{offset + i}@example.com', email=f'user{offset + i}@example.com',
+                 first_name=f'User{offset + i}', password=password_hash,
+                 date_joined=self.random_past(1000))
+            for i in range(count)
+        ), keep=lambda u: u.pk))
+        return users
+
+    def generate_orders(self, count, user_ids, product_ids, products, max_items, days):
+        if not count:
+            return
+        if not user_ids:
+            user_ids = list(User.objects.values_list('pk', flat=True))
+        if not product_ids:
+            products = {pk: (price, category_id) for pk, price, category_id
+                        in Product.objects.values_list('pk', 'price', 'category_id')}
+            product_ids = list(products)
+        if not user_ids or not product_ids:
+            raise CommandError("Orders need at least one user and one product")
+
+        rng = self.rng
+        # Popular products and repeat customers both follow a power law
+        product_picker = WeightedPicker(rng, product_ids, zipf_weights(len(product_ids)))
+        user_picker = WeightedPicker(rng, user_ids, zipf_weights(len(user_ids), 0.7))
+        cod_fee = Decimal('30.00')
+
+        started = time.perf_counter()
+        written = items_written = 0
+        while written < count:
+            size = min(self.chunk_size, count - written)
+            orders, lines = [], []
+            for _ in range(size):
+                n_items = min(max_items, 1 + int(rng.expovariate(0.7)))
+                chosen = {product_picker.pick() for _ in range(n_items)}
+                quantities = [(pid, 1 if rng.random() < 0.8 else rng.randint(2, 4)) for pid in chosen]
+                method = 'cod' if rng.random() < 0.65 else 'online'
+                fee = cod_fee if method == 'cod' else Decimal('0.00')
+                total = sum((products[pid][0] * qty for pid, qty in quantities), Decimal('0.00')) + fee
+                orders.append(Order(
+                    user_id=user_picker.pick(),
+                    ordered=True,
+                    ordered_at=self.random_past(days),
+                    payment_method=method,
+                    payment_status=rng.choices(('paid', 'pending', 'failed'), (0.8, 0.17, 0.03))[0],
+                    full_name='Generated Customer',
+                    phone=f'9{rng.randint(100000000, 999999999)}',
+                    city=rng.choice(CITIES),
+                    state=rng.choice(STATES),
+                    postal_code=str(rng.randint(110001, 855999)),
+                    cod_fee=fee,
+                    total_amount=total,
+                ))
+                lines.append(quantities)
+
+            with transaction.atomic():
+                created = Order.objects.bulk_create(orders, batch_size=self.batch_size)
+                items = [
+                    OrderItem(order_id=order.pk, product_id=pid, quantity=qty,
+                              price=products[pid][0], category_id=products[pid][1])
+                    for order, quantities in zip(created, lines)
+                    for pid, qty in quantities
+                ]
+                OrderItem.objects.bulk_create(items, batch_size=self.batch_size)
+
+            written += size
+            items_written += len(items)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"  orders: {written:,}/{count:,}, items: {items_written:,} "
+                f"({(written + items_written) / elapsed:,.0f} rows/s)"
+            )
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import images, page_cache
+from core.models import Product
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG variants for every product image (backfill)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help="Regenerate variants that already exist.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        names = (
+            Product.objects.exclude(image='').exclude(image__isnull=True)
+            .values_list('image', flat=True).distinct().iterator()
+        )
+        processed = written = 0
+        for name in names:
+            written += images.generate_variants(name, force=options['force'])
+            processed += 1
+
+        if written:
+            # Cached grids and detail pages were rendered without these srcsets
+            page_cache.bump_catalog_version()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} images, wrote {written} variant files in {elapsed:.2f}s"
+        ))
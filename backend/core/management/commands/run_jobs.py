@@ -0,0 +1,70 @@
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs with a pool of worker threads. "
+        "Stops claiming new work on SIGINT/SIGTERM and waits for running jobs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to sleep when no job is due.")
+        parser.add_argument('--visibility-timeout', type=int, default=None,
+                            help="Seconds a claimed job stays leased (default: JOB_VISIBILITY_TIMEOUT).")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once no job is due instead of polling.")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        timeout = options['visibility_timeout'] or settings.JOB_VISIBILITY_TIMEOUT
+        self.stopping = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stopping.set())
+
+        done = failed = 0
+        running = set()
+        with ThreadPoolExecutor(workers, thread_name_prefix='job') as pool:
+            while not self.stopping.is_set():
+                free = workers - len(running)
+                claimed = jobs.claim(free, timeout) if free else []
+                for job in claimed:
+                    running.add(pool.submit(self.run_one, job))
+
+                if running:
+                    # Wake up as soon as a slot frees, or poll for newly due jobs
+                    finished, running = wait(running, timeout=options['poll_interval'],
+                                             return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        if future.result():
+                            done += 1
+                        else:
+                            failed += 1
+                elif options['once']:
+                    break
+                else:
+                    self.stopping.wait(options['poll_interval'])
+
+            for future in wait(running).done:
+                if future.result():
+                    done += 1
+                else:
+                    failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Jobs done: {done}, failed attempts: {failed}"))
+
+    def run_one(self, job):
+        close_old_connections()
+        try:
+            return jobs.run(job)
+        finally:
+            connections.close_all()
@@ -0,0 +1,54 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core import page_cache
+from core.routers import replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into every replica alias (DB_REPLICAS) "
+        "with the online backup API. Use --interval to keep them in sync; keep it "
+        "below REPLICA_PIN_SECONDS so writers never see their own data missing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Repeat every N seconds until interrupted (default: once).")
+        parser.add_argument('--pages', type=int, default=4096,
+                            help="Pages copied per backup step; smaller steps hold locks for less time.")
+
+    def handle(self, *args, **options):
+        replicas = replica_aliases()
+        if not replicas:
+            raise CommandError("No replicas configured; set DB_REPLICAS.")
+        for alias in [DEFAULT_DB_ALIAS] + replicas:
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f"'{alias}' is not SQLite; use the database's own replication.")
+
+        while True:
+            self.snapshot(replicas, options['pages'])
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def snapshot(self, replicas, pages):
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        for alias in replicas:
+            started = time.perf_counter()
+            # The backup replaces the replica in one write transaction, so its
+            # readers see either the old or the new copy, never a mix
+            target = sqlite3.connect(connections[alias].settings_dict['NAME'], timeout=30)
+            try:
+                primary.connection.backup(target, pages=pages)
+            finally:
+                target.close()
+            self.stdout.write(f"  {alias}: {time.perf_counter() - started:.2f}s")
+
+        # Fragments rendered from the old copies must not outlive them
+        page_cache.bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f"Synced {len(replicas)} replica(s)"))
@@ -0,0 +1,132 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import routers
+
+logger = logging.getLogger('core.sql')
+
+PLACEHOLDER_LIST_RE = re.compile(r'%s(?:\s*,\s*%s)+')
+NUMBER_RE = re.compile(r'\b\d+\b')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def query_shape(sql):
+    """SQL with literals and IN-list lengths folded, so repeats of one query match."""
+    sql = PLACEHOLDER_LIST_RE.sub('%s, ...', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    return WHITESPACE_RE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """execute_wrapper that counts queries and SQL time per raw statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    def repeated_shapes(self, threshold):
+        # Shapes are only computed for distinct statements, at the end
+        shapes = Counter()
+        for sql, count in self.statements.items():
+            shapes[query_shape(sql)] += count
+        return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+
+# ---------------------------------------------------------
+# SQL INSTRUMENTATION MIDDLEWARE
+# ---------------------------------------------------------
+class QueryInstrumentationMiddleware:
+    """
+    Records query count, SQL time and repeated query shapes per request.
+
+    Adds a Server-Timing header (visible in browser dev tools) and writes
+    one JSON log line to the `core.sql` logger. A query shape repeated
+    SQL_N_PLUS_ONE_THRESHOLD times or more is logged as a probable N+1 at
+    WARNING level. The per-query cost is a timer and a dict increment.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'SQL_N_PLUS_ONE_THRESHOLD', 5)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        db_ms = recorder.duration * 1000
+        total_ms = total * 1000
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries", '
+            f'app;dur={total_ms - db_ms:.1f}'
+        )
+
+        repeated = recorder.repeated_shapes(self.threshold)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(total_ms, 2),
+        }
+        if repeated:
+            record['n_plus_one'] = [
+                {'count': count, 'sql': shape[:200]} for shape, count in repeated
+            ]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+        return response
+
+
+# ---------------------------------------------------------
+# READ-YOUR-WRITES PINNING
+# ---------------------------------------------------------
+class ReplicaPinningMiddleware:
+    """
+    Keeps a client on the primary database right after it writes.
+
+    A request that writes (an order, a login, a profile change) gets a
+    short-lived cookie; while it is present, every read of that client is
+    routed to the primary, so replica lag is never visible to the writer.
+    """
+
+    cookie_name = 'db_pin'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tokens = routers.begin_request(self.cookie_name in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.end_request(tokens)
+        if wrote and routers.replica_aliases():
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
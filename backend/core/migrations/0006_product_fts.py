@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# The index as of this migration; later changes to core.search get their own
+# migration instead of rewriting this one.
+CREATE_FTS_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_product_fts USING fts5("
+    "title, description, category, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+POPULATE_FTS_SQL = (
+    "INSERT INTO core_product_fts(rowid, title, description, category) "
+    "SELECT p.id, p.title, COALESCE(p.description, ''), COALESCE(c.name, '') "
+    "FROM core_product p LEFT JOIN core_category c ON c.id = p.category_id"
+)
+OPTIMIZE_FTS_SQL = "INSERT INTO core_product_fts(core_product_fts) VALUES ('optimize')"
+DROP_FTS_SQL = "DROP TABLE IF EXISTS core_product_fts"
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_FTS_SQL)
+    schema_editor.execute(POPULATE_FTS_SQL)
+    schema_editor.execute(OPTIMIZE_FTS_SQL)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(DROP_FTS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_product_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
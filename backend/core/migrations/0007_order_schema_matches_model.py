@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_address_and_created(apps, schema_editor):
+    # 0004 moved these columns away from what models.py and the views use;
+    # keep existing rows' data when moving them back.
+    Order = apps.get_model('core', 'Order')
+    Order.objects.update(address_line1=F('address'), ordered_at=F('created'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_product_fts'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='order',
+            old_name='pincode',
+            new_name='postal_code',
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='address_line1',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='address_line2',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='cod_fee',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='country',
+            field=models.CharField(blank=True, default='India', max_length=120, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='ordered',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='ordered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(copy_address_and_created, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='order',
+            name='address',
+        ),
+        migrations.RemoveField(
+            model_name='order',
+            name='created',
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='city',
+            field=models.CharField(blank=True, max_length=120, null=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='email',
+            field=models.EmailField(blank=True, max_length=254, null=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='full_name',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='payment_method',
+            field=models.CharField(choices=[('cod', 'Cash on Delivery'), ('online', 'Online Payment')], default='cod', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='phone',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='state',
+            field=models.CharField(blank=True, max_length=120, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:02
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Rows without updated_at carry no HTTP validator; stamp them once
+    now = timezone.now()
+    for name in ('Category', 'Product'):
+        model = apps.get_model('core', name)
+        model.objects.filter(updated_at__isnull=True).update(updated_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_order_schema_matches_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
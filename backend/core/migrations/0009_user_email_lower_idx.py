@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Expression index for the case-insensitive email login lookup.
+
+    auth_user belongs to django.contrib.auth, so the index is created with
+    plain SQL (LOWER() expression indexes work on SQLite and PostgreSQL).
+    """
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0008_category_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_user_email_lower_idx ON auth_user (LOWER(email))',
+            'DROP INDEX IF EXISTS core_user_email_lower_idx',
+        ),
+    ]
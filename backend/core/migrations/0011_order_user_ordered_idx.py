@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_product_category_price_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-ordered_at', '-id'], name='order_user_ordered_idx'),
+        ),
+    ]
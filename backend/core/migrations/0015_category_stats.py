@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+
+def summarize_categories(apps, schema_editor):
+    Category = apps.get_model('core', 'Category')
+    CategoryStats = apps.get_model('core', 'CategoryStats')
+    rows = Category.objects.annotate(
+        count=Count('product'),
+        low=Min('product__price'),
+        high=Max('product__price'),
+        latest=Max('product__updated_at'),
+    ).values_list('pk', 'count', 'low', 'high', 'latest')
+    CategoryStats.objects.bulk_create([
+        CategoryStats(category_id=pk, product_count=count, min_price=low, max_price=high, last_product_update=latest)
+        for pk, count, low, high, latest in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_stripe_event_inbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.category')),
+                ('product_count', models.PositiveIntegerField(default=0)),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('last_product_update', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(summarize_categories, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_uncategorized_rows(apps, schema_editor):
+    # Rows of deleted categories were set to NULL and could pile up per day
+    DailyCategorySales = apps.get_model('core', 'DailyCategorySales')
+    uncategorized = DailyCategorySales.objects.filter(category__isnull=True)
+    duplicated = uncategorized.values('date').annotate(rows=Count('id')).filter(rows__gt=1)
+    for day in duplicated.values_list('date', flat=True):
+        rows = uncategorized.filter(date=day)
+        totals = rows.aggregate(revenue=Sum('revenue'), units=Sum('units'), order_count=Sum('order_count'))
+        keep = rows.order_by('id').first()
+        rows.exclude(pk=keep.pk).delete()
+        DailyCategorySales.objects.filter(pk=keep.pk).update(**totals)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_catalog_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailycategorysales',
+            name='category',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='core.category'),
+        ),
+        migrations.RunPython(merge_uncategorized_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailycategorysales',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('date',), name='daily_category_sales_uncategorized_uniq'),
+        ),
+    ]
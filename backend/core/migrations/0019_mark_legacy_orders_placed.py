@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:40
+
+from django.db import migrations
+
+
+def mark_legacy_orders_placed(apps, schema_editor):
+    # 0007 added Order.ordered with default False, but every order that
+    # existed then had been placed through checkout; nothing creates an
+    # unplaced order since, so all such rows are legacy ones. Run
+    # backfill_sales_rollups afterwards if the rollups were built already.
+    Order = apps.get_model('core', 'Order')
+    Order.objects.filter(ordered=False).update(ordered=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_daily_category_sales_null_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_legacy_orders_placed, migrations.RunPython.noop),
+    ]
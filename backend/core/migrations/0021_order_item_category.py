@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_product_categories(apps, schema_editor):
+    # Earlier lines never recorded their category; the product's current
+    # one is the best guess, and the one the rollups were built from.
+    OrderItem = apps.get_model('core', 'OrderItem')
+    Product = apps.get_model('core', 'Product')
+    OrderItem.objects.update(
+        category_id=Subquery(Product.objects.filter(pk=OuterRef('product_id')).values('category_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_catalog_version_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='category',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.category'),
+        ),
+        migrations.RunPython(copy_product_categories, migrations.RunPython.noop),
+    ]
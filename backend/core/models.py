@@ -12,10 +12,48 @@ class Category(models.Model):
     name = models.CharField(max_length=120)
     slug = models.SlugField(unique=True)
 
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
     def __str__(self):
         return self.name
 
 
+# ============================
+# CATALOG VERSION
+# ============================
+class CatalogVersion(models.Model):
+    """
+    The single row (pk=1) whose version is embedded in every cached catalog
+    fragment key (core.page_cache). It lives in the database so a bump from
+    any process (web worker, management command, shell) is seen by all.
+    updated_at is the time of the last bump: the catalog API's Last-Modified.
+    """
+    version = models.BigIntegerField()
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Catalog version {self.version}"
+
+
+# ============================
+# CATEGORY FACET SUMMARY
+# ============================
+class CategoryStats(models.Model):
+    """
+    Per-category product count and price range, kept current by Product
+    signals (core.facets) so facets never need COUNT(*) ... GROUP BY.
+    """
+    category = models.OneToOneField(Category, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    product_count = models.PositiveIntegerField(default=0)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # Last time a product in the category was added, changed or removed
+    last_product_update = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.category} ({self.product_count})"
+
+
 # ============================
 # PRODUCT MODEL
 # ============================
@@ -26,10 +64,23 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     image = models.ImageField(upload_to='products/', null=True, blank=True)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    # Units available to sell; None means stock isn't tracked (never sells out)
+    stock = models.PositiveIntegerField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True, null=True)
     updated_at = models.DateTimeField(auto_now=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination: ORDER BY created_at DESC, id DESC
+            models.Index(fields=['-created_at', '-id'], name='product_created_id_idx'),
+            # ?category= with the default and the price orderings
+            models.Index(fields=['category', '-created_at', '-id'], name='product_cat_created_idx'),
+            models.Index(fields=['category', 'price', 'id'], name='product_cat_price_idx'),
+            # ?ordering=price across the whole catalog
+            models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -67,6 +118,14 @@ class Order(models.Model):
     cod_fee = models.DecimalField(max_digits=6, decimal_places=2, default=0)  # <-- New
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    class Meta:
+        indexes = [
+            # Order history: WHERE user_id = ? ORDER BY ordered_at DESC, id DESC
+            models.Index(fields=['user', '-ordered_at', '-id'], name='order_user_ordered_idx'),
+            # Sales rollup backfill: one range of days at a time
+            models.Index(fields=['ordered_at'], name='order_ordered_at_idx'),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} - {self.user}"
 
@@ -104,6 +163,11 @@ class OrderItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
     price = models.DecimalField(max_digits=10, decimal_places=2)  # copy product price at purchase time
+    # Category at purchase time: the sales rollups count the line there even
+    # if the product moves later. No FK constraint, like DailyCategorySales.
+    category = models.ForeignKey(
+        Category, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+',
+    )
 
     def get_subtotal(self):
         return self.quantity * self.price
@@ -118,7 +182,8 @@ class OrderItem(models.Model):
 class Payment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='payment', null=True)
-    stripe_payment_id = models.CharField(max_length=255)
+    # Checkout session id; webhook events are matched on it
+    stripe_payment_id = models.CharField(max_length=255, db_index=True)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=20, default="pending")  # pending / success / failed
     timestamp = models.DateTimeField(default=timezone.now)
@@ -131,3 +196,147 @@ class Payment(models.Model):
 
     def __str__(self):
         return f"Payment {self.id} - {self.status}"
+
+
+# ============================
+# STRIPE WEBHOOK INBOX
+# ============================
+class StripeEvent(models.Model):
+    """A verified Stripe webhook event, stored once per event id and applied in batches."""
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Pending events in arrival order: processed_at IS NULL ORDER BY id
+            models.Index(fields=['processed_at', 'id'], name='stripe_event_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.type} {self.event_id}"
+
+
+# ============================
+# STOCK RESERVATION MODEL
+# ============================
+class StockReservation(models.Model):
+    """Units taken out of Product.stock and held for a user until expires_at."""
+    ACTIVE = "active"
+    CONVERTED = "converted"
+    RELEASED = "released"
+    STATUS_CHOICES = [
+        (ACTIVE, "Active"),
+        (CONVERTED, "Converted to order"),
+        (RELEASED, "Released"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=ACTIVE)
+    expires_at = models.DateTimeField()
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Expiry sweep: active reservations past expires_at
+            models.Index(fields=['status', 'expires_at'], name='reservation_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} × {self.product_id} for {self.user} ({self.status})"
+
+
+# ============================
+# BACKGROUND JOB MODEL
+# ============================
+class Job(models.Model):
+    """A unit of deferred work, run by `manage.py run_jobs` (see core/jobs.py)."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (FAILED, "Failed"),
+    ]
+
+    task = models.CharField(max_length=255)  # dotted path of the callable
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+
+    # Lease held by the worker running it; expired leases are picked up again
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Claim query: queued and due, or running with an expired lease
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+            models.Index(fields=['status', 'locked_until'], name='job_status_locked_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.id} {self.task} ({self.status})"
+
+
+# ============================
+# SALES ROLLUPS
+# ============================
+# One row per day and category / payment method, kept current as orders
+# are placed and fail (core.analytics). Reports read only these tables.
+# Revenue is the sum of line subtotals (COD fees excluded), so both tables
+# add up to the same daily total.
+class DailyCategorySales(models.Model):
+    date = models.DateField()
+    # NULL is uncategorized products. A deleted category keeps its rows
+    # under its old id (no FK constraint) instead of being folded into them.
+    category = models.ForeignKey(
+        Category, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True,
+    )
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units = models.IntegerField(default=0)
+    # Orders with at least one line in the category
+    order_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "daily category sales"
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'category'], name='daily_category_sales_uniq'),
+            # NULLs are distinct in a unique index: one uncategorized row per day
+            models.UniqueConstraint(
+                fields=['date'], condition=models.Q(category__isnull=True),
+                name='daily_category_sales_uncategorized_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.category}: {self.revenue}"
+
+
+class DailyPaymentSales(models.Model):
+    date = models.DateField()
+    payment_method = models.CharField(max_length=20, choices=Order.PAYMENT_METHOD_CHOICES)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units = models.IntegerField(default=0)
+    order_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "daily payment method sales"
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'payment_method'], name='daily_payment_sales_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.payment_method}: {self.revenue}"
@@ -0,0 +1,128 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import analytics, inventory, jobs
+from .models import Order, OrderItem, Product
+from .routers import use_primary
+
+
+COD_CHARGE = Decimal("30.00")
+
+
+class CheckoutError(Exception):
+    """Raised for carts that can't be turned into an order."""
+
+
+# ---------------------------------------------------------
+# CART PARSING
+# ---------------------------------------------------------
+def parse_cart(items):
+    """
+    Turn the client cart ([{"id", "quantity", ...}]) into {product_id: qty}.
+    Duplicate lines are merged; client-side prices are ignored.
+    """
+    quantities = {}
+    for item in items:
+        try:
+            product_id = int(item["id"])
+            qty = int(item.get("quantity", 1))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise CheckoutError("Invalid cart item")
+        if qty < 1:
+            raise CheckoutError("Quantity must be at least 1")
+        quantities[product_id] = quantities.get(product_id, 0) + qty
+
+    if not quantities:
+        raise CheckoutError("Cart is empty")
+    return quantities
+
+
+def parse_reservation_ids(value):
+    """Reservation ids sent back by the client (from POST /api/reservations/)."""
+    if not value:
+        return []
+    # A bare string would otherwise be read digit by digit ("12" -> [1, 2])
+    if not isinstance(value, list):
+        raise CheckoutError("Invalid reservation ids")
+    try:
+        return [int(pk) for pk in value]
+    except (TypeError, ValueError):
+        raise CheckoutError("Invalid reservation ids")
+
+
+# ---------------------------------------------------------
+# ORDER PLACEMENT
+# ---------------------------------------------------------
+def place_order(user, quantities, cod_fee=Decimal("0.00"), reservation_ids=None, **order_fields):
+    """
+    Create an Order and its OrderItems in one atomic unit.
+
+    Products are read from the primary with a single in_bulk() before the
+    transaction opens, and totals use those server-side prices. Inside the
+    transaction there are three INSERTs (order, all items via bulk_create,
+    and the confirmation job), one conditional stock UPDATE per product
+    whose stock is tracked and one sales rollup UPDATE per category and
+    payment method, so the SQLite write lock is held briefly whatever the
+    cart size. Slow follow-up work runs later in `manage.py run_jobs`.
+
+    Units covered by `reservation_ids` (see core.inventory.reserve) are
+    already set aside; the rest are taken from stock here. Raises
+    inventory.OutOfStock, with nothing saved, when they can't be.
+    """
+    # Charge current prices, not a replica's possibly older copy
+    with use_primary():
+        products = Product.objects.only("id", "price", "category_id", "stock").in_bulk(list(quantities))
+    missing = set(quantities) - set(products)
+    if missing:
+        raise CheckoutError(f"Unknown product(s): {', '.join(map(str, sorted(missing)))}")
+
+    lines = [(products[pid], qty) for pid, qty in quantities.items()]
+    subtotal = sum((product.price * qty for product, qty in lines), Decimal("0.00"))
+
+    with transaction.atomic():
+        order = Order.objects.create(
+            user=user,
+            ordered=True,
+            ordered_at=timezone.now(),
+            cod_fee=cod_fee,
+            total_amount=subtotal + cod_fee,
+            **order_fields,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=qty, price=product.price, category_id=product.category_id)
+            for product, qty in lines
+        ])
+        reserved = inventory.convert(user, reservation_ids, order) if reservation_ids else {}
+        # Untracked products (stock is NULL) never sell out: skip their UPDATEs
+        inventory.take_stock({
+            pid: qty - reserved.get(pid, 0)
+            for pid, qty in quantities.items()
+            if qty > reserved.get(pid, 0) and products[pid].stock is not None
+        })
+        inventory.return_stock({
+            pid: qty - quantities.get(pid, 0)
+            for pid, qty in reserved.items() if qty > quantities.get(pid, 0)
+        })
+        analytics.add_order(order, [(product.category_id, qty, product.price) for product, qty in lines])
+
+        # Committed with the order; run by `manage.py run_jobs`. Online
+        # orders are confirmed once the payment webhook marks them paid.
+        if order.payment_method != "online":
+            jobs.enqueue("core.tasks.send_order_confirmation", {"order_id": order.pk})
+
+    return order
+
+
+def cancel_order(order):
+    """Mark an unpaid order failed and put its units back in stock."""
+    with transaction.atomic():
+        if not Order.objects.filter(pk=order.pk, payment_status="pending").update(payment_status="failed"):
+            return
+        quantities = {}
+        for product_id, qty in order.items.values_list("product_id", "quantity"):
+            quantities[product_id] = quantities.get(product_id, 0) + qty
+        inventory.return_stock(quantities)
+        analytics.remove_orders([order.pk])
+    order.payment_status = "failed"
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CatalogVersion
+
+
+# ---------------------------------------------------------
+# VERSIONED CATALOG CACHE
+# ---------------------------------------------------------
+# Every cached catalog fragment key embeds the current catalog version.
+# Product/Category signals bump the version, so stale fragments are never
+# read again and simply age out of the cache; no TTL guessing needed.
+# The version is one database row rather than a cache key: with a
+# per-process cache, bumps from commands or other workers would otherwise
+# never reach this process. Reading it is a primary-key lookup per page.
+def get_catalog_state():
+    """(version, time of the last bump) of the catalog."""
+    state = CatalogVersion.objects.filter(pk=1).values_list('version', 'updated_at').first()
+    if state is None:
+        # Start from a timestamp so a shared cache never serves keys left
+        # over from an older database
+        row = CatalogVersion.objects.get_or_create(pk=1, defaults={'version': int(time.time() * 1000)})[0]
+        state = row.version, row.updated_at
+    return state
+
+
+def get_catalog_version():
+    return get_catalog_state()[0]
+
+
+def bump_catalog_version():
+    if not CatalogVersion.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now()):
+        get_catalog_version()
+
+
+def get_or_render(name, render):
+    """
+    Return the cached value for `name` at the current catalog version,
+    calling `render()` (ORM + template work) only on a miss.
+    """
+    key = f'catalog:v{get_catalog_version()}:{name}'
+    value = cache.get(key)
+    if value is None:
+        value = render()
+        cache.set(key, value, timeout=settings.CATALOG_CACHE_TIMEOUT)
+    return value
@@ -0,0 +1,222 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# ---------------------------------------------------------
+# KEYSET (CURSOR) PAGINATION
+# ---------------------------------------------------------
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (<ordering field>, id).
+
+    ?ordering= picks the key: -created_at (newest first, the default),
+    price or -price. Every page is a single range scan on the matching
+    (field, id) index, so page 1000 costs the same as page 1. The cursor is
+    an opaque base64 token holding the last row's key; rows with no value
+    for a nullable key sort last.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+
+    # ?ordering= value -> (key field, descending)
+    orderings = {
+        '-created_at': ('created_at', True),
+        'price': ('price', False),
+        '-price': ('price', True),
+    }
+    default_ordering = '-created_at'
+
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = self.order_queryset(queryset, request)
+
+        # Fetch one extra row to find out whether there is a next page
+        limit = self.page_size + 1
+        cursor = self.decode_cursor(request)
+        if cursor is None:
+            rows = list(queryset[:limit])
+        else:
+            rows = self.get_rows_after(queryset, *cursor, limit=limit)
+
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def order_queryset(self, queryset, request):
+        """Apply ?ordering= (validated) as a (key, id) index order."""
+        self.key_field, self.descending = self.get_ordering(request)
+        self.key_model_field = queryset.model._meta.get_field(self.key_field)
+        return queryset.order_by(*self.get_order_by())
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param) or self.default_ordering
+        if ordering not in self.orderings:
+            raise ValidationError({
+                self.ordering_query_param: f"Use one of: {', '.join(self.orderings)}",
+            })
+        return self.orderings[ordering]
+
+    def get_order_by(self):
+        key, pk = F(self.key_field), F('id')
+        if self.descending:
+            # NULLS LAST is SQLite's native DESC order, so the index still serves it
+            key = key.desc(nulls_last=True) if self.key_model_field.null else key.desc()
+            return key, pk.desc()
+        return key.asc(nulls_last=True) if self.key_model_field.null else key.asc(), pk.asc()
+
+    def get_rows_after(self, queryset, value, pk, limit):
+        """
+        Rows strictly after (value, pk) in page order.
+
+        The `field <= cursor` bound (>= when ascending) is what lets SQLite
+        seek straight into the index; the second condition only trims ties
+        on the cursor value. Rows without a value live in a separate index
+        range at the end, so they are read with a second seek when needed.
+        """
+        field = self.key_field
+        before, ties = ('lte', 'lt') if self.descending else ('gte', 'gt')
+        if value is None:
+            return list(queryset.filter(**{f'{field}__isnull': True, f'id__{ties}': pk})[:limit])
+
+        rows = list(
+            queryset
+            .filter(**{f'{field}__{before}': value})
+            .filter(Q(**{f'{field}__{ties}': value}) | Q(**{f'id__{ties}': pk}))[:limit]
+        )
+        if len(rows) < limit and self.key_model_field.null:
+            rows += list(queryset.filter(**{f'{field}__isnull': True})[:limit - len(rows)])
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(last))
+
+    # ---------------------------------------------------------
+    # Cursor encoding
+    # ---------------------------------------------------------
+    def encode_cursor(self, row):
+        # Pages hold model instances or .values() dicts
+        if isinstance(row, dict):
+            value, pk = row[self.key_field], row['id']
+        else:
+            value, pk = getattr(row, self.key_field), row.pk
+        if value is not None:
+            value = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+        payload = json.dumps([value, pk], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            pk = int(pk)
+            if value is not None:
+                value = self.key_model_field.to_python(value)
+        except (TypeError, ValueError, UnicodeDecodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+
+# ---------------------------------------------------------
+# RANKED SEARCH PAGINATION
+# ---------------------------------------------------------
+class SearchPagination(KeysetPagination):
+    """
+    Pagination for ranked ?search= results.
+
+    A bm25 score can't be used as a keyset, so the cursor here is an offset
+    into the ranked match list. That list is bounded by the number of
+    matches, not by the catalog size. ?ordering= does not apply here.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.offset = self.decode_cursor(request)
+
+        rows = list(queryset[self.offset:self.offset + self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        token = base64.urlsafe_b64encode(
+            f'o:{self.offset + self.page_size}'.encode()
+        ).decode().rstrip('=')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return 0
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            prefix, offset = base64.urlsafe_b64decode(padded.encode()).decode().split(':')
+            offset = int(offset)
+            if prefix != 'o' or offset < 0:
+                raise ValueError
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return offset
+
+
+# ---------------------------------------------------------
+# ORDER HISTORY PAGINATION
+# ---------------------------------------------------------
+class OrderPagination(KeysetPagination):
+    """Newest orders first, keyed on (ordered_at, id)."""
+    page_size = 10
+    max_page_size = 50
+
+    orderings = {
+        '-ordered_at': ('ordered_at', True),
+    }
+    default_ordering = '-ordered_at'
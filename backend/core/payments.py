@@ -0,0 +1,151 @@
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+import stripe
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class GatewayError(Exception):
+    """The payment provider failed or timed out."""
+
+
+class GatewayBusy(GatewayError):
+    """Too many provider calls already in flight in this process."""
+
+
+# ---------------------------------------------------------
+# GATEWAY INTERFACE
+# ---------------------------------------------------------
+class PaymentGateway(ABC):
+    """
+    Pluggable payment provider used by the checkout views.
+
+    Pick the implementation with settings.PAYMENT_GATEWAY (dotted path).
+    """
+
+    @abstractmethod
+    def create_checkout_session(self, line_items, success_url, cancel_url, idempotency_key, metadata=None):
+        """
+        Create a hosted checkout session and return its id.
+
+        `metadata` ({str: str}) is stored on the session and comes back in
+        its webhook events.
+        """
+
+
+class StripeGateway(PaymentGateway):
+    """
+    Stripe Checkout with explicit connect/read timeouts.
+
+    The idempotency key is sent with every attempt, so the client's own
+    network retries can never create a second session. The call runs in
+    the request thread, which can block for up to
+    (STRIPE_CONNECT_TIMEOUT + STRIPE_READ_TIMEOUT) * (1 + STRIPE_MAX_NETWORK_RETRIES)
+    seconds; keep that budget small.
+    """
+
+    def __init__(self):
+        self.client = stripe.StripeClient(
+            settings.STRIPE_SECRET_KEY,
+            http_client=stripe.RequestsClient(
+                timeout=(settings.STRIPE_CONNECT_TIMEOUT, settings.STRIPE_READ_TIMEOUT),
+            ),
+            max_network_retries=settings.STRIPE_MAX_NETWORK_RETRIES,
+        )
+
+    def create_checkout_session(self, line_items, success_url, cancel_url, idempotency_key, metadata=None):
+        try:
+            session = self.client.v1.checkout.sessions.create(
+                params={
+                    'payment_method_types': ['card'],
+                    'mode': 'payment',
+                    'line_items': line_items,
+                    'success_url': success_url,
+                    'cancel_url': cancel_url,
+                    'metadata': metadata or {},
+                },
+                options={'idempotency_key': idempotency_key},
+            )
+        except stripe.StripeError as e:
+            raise GatewayError(str(e)) from e
+        return session.id
+
+
+class LocalGateway(PaymentGateway):
+    """
+    In-process Stripe stand-in for development and load tests.
+
+    Sleeps for settings.LOCAL_GATEWAY_LATENCY seconds to imitate a slow
+    provider, and returns the same fake session id for a repeated
+    idempotency key, like Stripe does.
+    """
+
+    def __init__(self):
+        self.latency = settings.LOCAL_GATEWAY_LATENCY
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def create_checkout_session(self, line_items, success_url, cancel_url, idempotency_key, metadata=None):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            if idempotency_key not in self.sessions:
+                self.sessions[idempotency_key] = f'cs_test_local_{uuid.uuid4().hex}'
+            return self.sessions[idempotency_key]
+
+
+# ---------------------------------------------------------
+# BOUNDED ACCESS
+# ---------------------------------------------------------
+_state = None
+_state_lock = threading.Lock()
+
+
+def _get_state():
+    global _state
+    if _state is None:
+        with _state_lock:
+            if _state is None:
+                _state = (
+                    import_string(settings.PAYMENT_GATEWAY)(),
+                    threading.BoundedSemaphore(settings.PAYMENT_GATEWAY_MAX_CONCURRENCY),
+                )
+    return _state
+
+
+def get_gateway():
+    return _get_state()[0]
+
+
+def reset_gateway():
+    """Forget the configured gateway (e.g. after changing settings)."""
+    global _state
+    with _state_lock:
+        _state = None
+
+
+def create_checkout_session(line_items, success_url, cancel_url, idempotency_key=None, metadata=None):
+    """
+    Create a checkout session through the configured gateway.
+
+    At most PAYMENT_GATEWAY_MAX_CONCURRENCY calls run at once per process.
+    When the provider is slow and every slot is taken, further callers get
+    GatewayBusy straight away instead of parking yet another worker on the
+    network, so the rest of the site keeps its workers. The slots bound
+    how many workers wait, not how long each one does: that is the
+    gateway's own timeout and retry budget.
+    """
+    gateway, slots = _get_state()
+    if not slots.acquire(timeout=settings.PAYMENT_GATEWAY_QUEUE_TIMEOUT):
+        raise GatewayBusy('Payment provider is busy, please retry')
+    try:
+        return gateway.create_checkout_session(
+            line_items, success_url, cancel_url,
+            idempotency_key or uuid.uuid4().hex,
+            metadata,
+        )
+    finally:
+        slots.release()
@@ -0,0 +1,58 @@
+import json
+import zlib
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# ---------------------------------------------------------
+# JSON LINES (?format=jsonl)
+# ---------------------------------------------------------
+class JSONLinesRenderer(BaseRenderer):
+    """
+    One compact JSON document per line (NDJSON).
+
+    Product exports stream their rows themselves (see
+    ProductValuesListMixin.stream_list); this renders everything else that
+    ends up negotiated as jsonl: a list is one line per item, anything else
+    (a single product, an error) a single line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(encode_line(item) for item in items)
+
+
+def encode_line(item):
+    return json.dumps(item, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode() + b'\n'
+
+
+# ---------------------------------------------------------
+# STREAMING
+# ---------------------------------------------------------
+def jsonl_chunks(rows, serialize, chunk_size):
+    """
+    Encode an iterable of rows as JSON Lines, one bytes chunk per
+    `chunk_size` rows; `serialize` turns a list of rows into dicts.
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == chunk_size:
+            yield b''.join(map(encode_line, serialize(batch)))
+            batch = []
+    if batch:
+        yield b''.join(map(encode_line, serialize(batch)))
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a byte stream as it goes; each input chunk is flushed so the client sees it."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
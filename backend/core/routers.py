@@ -0,0 +1,72 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+# ---------------------------------------------------------
+# PRIMARY / REPLICA ROUTING
+# ---------------------------------------------------------
+# Catalog models are read from a replica alias (DB_REPLICAS), everything
+# else, and every write, goes to the primary. Once a request writes, its
+# remaining reads and the client's next REPLICA_PIN_SECONDS of requests
+# stay on the primary (see ReplicaPinningMiddleware), so a customer never
+# reads older data than they just wrote. Outside a request (management
+# commands, shell, workers) everything stays on the primary.
+_pinned = ContextVar('db_pinned_to_primary', default=True)
+_wrote = ContextVar('db_wrote', default=False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+@contextmanager
+def use_primary():
+    """Route every read in the block to the primary."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def begin_request(pinned):
+    """Reset routing state for a new request; returns tokens for end_request()."""
+    return _pinned.set(pinned), _wrote.set(False)
+
+
+def end_request(tokens):
+    """Restore routing state; True when the request wrote to the primary."""
+    wrote = _wrote.get()
+    pinned_token, wrote_token = tokens
+    _pinned.reset(pinned_token)
+    _wrote.reset(wrote_token)
+    return wrote
+
+
+class PrimaryReplicaRouter:
+    def __init__(self):
+        self.replicas = replica_aliases()
+        self.read_models = set(getattr(settings, 'REPLICA_READ_MODELS', ()))
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or _pinned.get() or _wrote.get():
+            return DEFAULT_DB_ALIAS
+        if model._meta.label_lower in self.read_models:
+            return random.choice(self.replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas are copies of the primary, so objects from any alias relate
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from `manage.py snapshot_replicas`
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,150 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Q
+from rest_framework.filters import BaseFilterBackend
+
+
+# ---------------------------------------------------------
+# FTS5 PRODUCT INDEX
+# ---------------------------------------------------------
+# rowid of the virtual table is Product.id; the table keeps its own copy of
+# the indexed text so a search never touches core_product until the join.
+FTS_TABLE = 'core_product_fts'
+
+# bm25() column weights: title, description, category
+FTS_WEIGHTS = (10.0, 1.0, 4.0)
+
+CREATE_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, description, category, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+DROP_FTS_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+MAX_TERMS = 8
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """
+    Turn free user input into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so punctuation and FTS5
+    operators typed by users can't break the query, and "iph pro" already
+    matches while the user is still typing.
+    """
+    terms = TERM_RE.findall(text or '')[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def index_product(product):
+    category = product.category.name if product.category_id else ''
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, description, category) VALUES (%s, %s, %s, %s)",
+            [product.pk, product.title, product.description or '', category],
+        )
+
+
+def index_products_by_slug(slugs, chunk_size=500):
+    """Re-index many products at once (bulk writes such as imports send no signals)."""
+    slugs = list(slugs)
+    with connection.cursor() as cursor:
+        for start in range(0, len(slugs), chunk_size):
+            chunk = slugs[start:start + chunk_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN "
+                f"(SELECT id FROM core_product WHERE slug IN ({placeholders}))",
+                chunk,
+            )
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, title, description, category) "
+                "SELECT p.id, p.title, COALESCE(p.description, ''), COALESCE(c.name, '') "
+                "FROM core_product p LEFT JOIN core_category c ON c.id = p.category_id "
+                f"WHERE p.slug IN ({placeholders})",
+                chunk,
+            )
+
+
+def remove_product(product_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product_id])
+
+
+def update_category_name(category_id, name):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {FTS_TABLE} SET category = %s "
+            "WHERE rowid IN (SELECT id FROM core_product WHERE category_id = %s)",
+            [name, category_id],
+        )
+
+
+def rebuild_index(using=DEFAULT_DB_ALIAS):
+    """Re-create the whole index from core_product. Returns the row count."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(CREATE_FTS_SQL)
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, description, category) "
+            "SELECT p.id, p.title, COALESCE(p.description, ''), COALESCE(c.name, '') "
+            "FROM core_product p LEFT JOIN core_category c ON c.id = p.category_id"
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def search(queryset, text):
+    """
+    Restrict a Product queryset to rows matching `text`, best match first.
+
+    The FTS table drives the join, so the cost depends on the number of
+    matches rather than on the size of the catalog.
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+
+    if not is_enabled():
+        q = Q()
+        for term in TERM_RE.findall(text)[:MAX_TERMS]:
+            q &= (
+                Q(title__icontains=term)
+                | Q(description__icontains=term)
+                | Q(category__name__icontains=term)
+            )
+        return queryset.filter(q).order_by('-created_at', '-id')
+
+    weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = core_product.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={'search_rank': f'bm25({FTS_TABLE}, {weights})'},
+        order_by=['search_rank', '-id'],
+    )
+
+
+# ---------------------------------------------------------
+# API: ?search= FILTER
+# ---------------------------------------------------------
+class ProductSearchFilter(BaseFilterBackend):
+    search_param = 'search'
+
+    @classmethod
+    def get_search_text(cls, request):
+        return request.query_params.get(cls.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        text = self.get_search_text(request)
+        if not text:
+            return queryset
+        return search(queryset, text)
@@ -1,12 +1,134 @@
-from rest_framework import serializers
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import Product, Category, Order, OrderItem
+from . import images
+
+
+class DynamicFieldsMixin:
+    """
+    Accepts `fields=[...]` to serialize only a subset of the declared fields
+    (backs the ?fields=id,title,price query parameter).
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class ProductSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    image_srcset = serializers.SerializerMethodField()
+    # Lets clients link to ?category=<slug>; views select_related('category')
+    category_slug = serializers.SlugRelatedField(source='category', slug_field='slug', read_only=True)
 
-class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = '__all__'
 
+    def get_image_srcset(self, obj):
+        if not obj.image:
+            return None
+        return images.srcsets(obj.image.name)
+
+
+class ProductValuesSerializer:
+    """
+    Fast list serialization straight from `.values()` rows.
+
+    Produces the same JSON as ProductSerializer(many=True) but skips model
+    instantiation and DRF's per-row field machinery: each column is turned
+    into a converter once, and every row is a single dict comprehension.
+    """
+    def __init__(self, fields=None, context=None):
+        template = ProductSerializer(fields=fields, context=context or {})
+        self.fields = list(template.fields)
+        self.request = (context or {}).get('request')
+        self.converters = [(name, self.get_converter(name, template.fields[name])) for name in self.fields]
+
+    # Serializer fields backed by another column (or a join)
+    SOURCE_COLUMNS = {'image_srcset': 'image', 'category_slug': 'category__slug'}
+
+    @property
+    def db_fields(self):
+        """Columns to pass to .values(); id/created_at/price keep keyset pagination working."""
+        columns = {'id', 'created_at', 'price'}
+        for name in self.fields:
+            columns.add(self.SOURCE_COLUMNS.get(name, name))
+        return sorted(columns)
+
+    def get_converter(self, name, field):
+        if name == 'image':
+            return lambda row: self.image_url(row['image'])
+        if name == 'image_srcset':
+            return lambda row: images.srcsets(row['image']) if row['image'] else None
+        if name == 'category_slug':
+            return lambda row: row['category__slug']
+        if isinstance(field, serializers.DateTimeField):
+            return self.datetime_converter(name, field)
+        if isinstance(field, serializers.DecimalField):
+            to_representation = field.to_representation
+            return lambda row: None if row[name] is None else to_representation(row[name])
+        return lambda row: row[name]
+
+    def datetime_converter(self, name, field):
+        """DateTimeField.to_representation, with the timezone looked up once instead of per value."""
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if tz is None or output_format is None or output_format.lower() != ISO_8601:
+            return lambda row: None if row[name] is None else field.to_representation(row[name])
+
+        def convert(row):
+            value = row[name]
+            if value is None or value.tzinfo is None:
+                return None if value is None else field.to_representation(value)
+            text = value.astimezone(tz).isoformat()
+            return text[:-6] + 'Z' if text.endswith('+00:00') else text
+        return convert
+
+    def image_url(self, name):
+        if not name:
+            return None
+        url = Product._meta.get_field('image').storage.url(name)
+        if self.request is not None:
+            return self.request.build_absolute_uri(url)
+        return url
+
+    def serialize(self, rows):
+        converters = self.converters
+        return [{name: convert(row) for name, convert in converters} for row in rows]
+
+
 class CategorySerializer(serializers.ModelSerializer):
+    # Facet summary from CategoryStats; select_related('stats') in the view
+    product_count = serializers.IntegerField(source='stats.product_count', read_only=True, default=0)
+    min_price = serializers.DecimalField(source='stats.min_price', max_digits=10, decimal_places=2, read_only=True)
+    max_price = serializers.DecimalField(source='stats.max_price', max_digits=10, decimal_places=2, read_only=True)
+    last_product_update = serializers.DateTimeField(source='stats.last_product_update', read_only=True)
+
     class Meta:
         model = Category
         fields = '__all__'
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    product_id = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(source='product.title', read_only=True)
+    slug = serializers.CharField(source='product.slug', read_only=True)
+    image = serializers.ImageField(source='product.image', read_only=True)
+    subtotal = serializers.DecimalField(source='get_subtotal', max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ['product_id', 'title', 'slug', 'image', 'quantity', 'price', 'subtotal']
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    items = OrderItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'ordered_at', 'payment_method', 'payment_status',
+            'cod_fee', 'total_amount', 'items',
+        ]
@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import facets, images, page_cache, search
+from .backends import invalidate_cached_user
+from .models import Category, CategoryStats, Product
+
+
+# ---------------------------------------------------------
+# SEARCH INDEX SYNC
+# ---------------------------------------------------------
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    if search.is_enabled():
+        search.index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    if search.is_enabled():
+        search.remove_product(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_name(sender, instance, created=False, **kwargs):
+    if search.is_enabled() and not created:
+        search.update_category_name(instance.pk, instance.name)
+
+
+@receiver(pre_delete, sender=Category)
+def clear_category_name(sender, instance, **kwargs):
+    # Products are SET_NULL by a plain UPDATE, which sends no Product signals
+    if search.is_enabled():
+        search.update_category_name(instance.pk, '')
+
+
+# ---------------------------------------------------------
+# CATEGORY FACET SUMMARY
+# ---------------------------------------------------------
+# QuerySet.update()/bulk_create() send no signals; run
+# `manage.py rebuild_category_stats` after bulk catalog edits.
+def facet_state(category_id, price):
+    if category_id is None:
+        return None
+    return category_id, Product._meta.get_field('price').to_python(price)
+
+
+@receiver(pre_save, sender=Product)
+def remember_facet_state(sender, instance, **kwargs):
+    old = None
+    if instance.pk is not None:
+        old = Product.objects.filter(pk=instance.pk).values_list('category_id', 'price').first()
+    instance._facet_before = facet_state(*old) if old else None
+
+
+@receiver(post_save, sender=Product)
+def update_category_stats(sender, instance, **kwargs):
+    facets.product_changed(
+        getattr(instance, '_facet_before', None),
+        facet_state(instance.category_id, instance.price),
+        instance.updated_at,
+    )
+
+
+@receiver(post_delete, sender=Product)
+def remove_from_category_stats(sender, instance, **kwargs):
+    facets.product_changed(facet_state(instance.category_id, instance.price), None)
+
+
+@receiver(post_save, sender=Category)
+def create_category_stats(sender, instance, created=False, **kwargs):
+    if created:
+        CategoryStats.objects.get_or_create(category=instance)
+
+
+# ---------------------------------------------------------
+# PAGE CACHE INVALIDATION
+# ---------------------------------------------------------
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_catalog_version(sender, **kwargs):
+    page_cache.bump_catalog_version()
+
+
+# ---------------------------------------------------------
+# RESPONSIVE IMAGE VARIANTS
+# ---------------------------------------------------------
+@receiver(post_save, sender=Product)
+def generate_image_variants(sender, instance, raw=False, **kwargs):
+    # Fixture loads skip this; run `manage.py generate_image_variants` after
+    if not raw and instance.image:
+        images.generate_variants(instance.image.name)
+
+
+# ---------------------------------------------------------
+# USER CACHE INVALIDATION
+# ---------------------------------------------------------
+# Covers profile edits, set_password() + save() and last_login updates.
+# QuerySet.update() on users sends no signal and is not covered.
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
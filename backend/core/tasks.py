@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from . import inventory
+from .models import Order
+
+
+# ---------------------------------------------------------
+# BACKGROUND TASKS
+# ---------------------------------------------------------
+# Queued with core.jobs.enqueue('core.tasks.<name>', payload) and run by
+# `manage.py run_jobs`. Delivery is at-least-once (a job whose worker
+# dies is retried), so tasks must be safe to run twice.
+def send_order_confirmation(payload):
+    order = (
+        Order.objects
+        .select_related('user')
+        .prefetch_related('items__product')
+        .get(pk=payload['order_id'])
+    )
+    recipient = order.email or order.user.email
+    if not recipient:
+        return
+
+    lines = [
+        f"{item.quantity} × {item.product.title} — ₹{item.get_subtotal()}"
+        for item in order.items.all()
+    ]
+    if order.cod_fee:
+        lines.append(f"COD charge — ₹{order.cod_fee}")
+    send_mail(
+        subject=f"Order #{order.pk} confirmed",
+        message="\n".join(
+            [f"Hi {order.full_name or order.user.first_name or 'there'},", "", "Thanks for your order:", ""]
+            + lines
+            + ["", f"Total: ₹{order.total_amount}"]
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[recipient],
+    )
+
+
+def release_expired_reservations(payload):
+    inventory.release_expired()
+
+
+def apply_stripe_events(payload):
+    # Imported here: webhooks pulls in the stripe SDK, which other tasks don't need
+    from . import webhooks
+    webhooks.apply_pending()
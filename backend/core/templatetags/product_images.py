@@ -0,0 +1,13 @@
+from django import template
+
+from core import images
+
+register = template.Library()
+
+
+@register.filter
+def srcset(image, fmt='jpeg'):
+    """{{ product.image|srcset:"webp" }} -> "…-160w.webp 160w, …" (or "")."""
+    if not image:
+        return ''
+    return images.srcset(image.name, fmt)
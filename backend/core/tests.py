@@ -0,0 +1,310 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import Client, TestCase, override_settings
+
+from . import payments
+from .models import Category, Order, Payment, Product
+
+
+# Pages link static files; tests don't run collectstatic first
+UNHASHED_STATIC = {
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+class ConditionalGetTests(TestCase):
+    def test_validators_cost_no_catalog_scan(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        Product.objects.create(title='Saw', slug='saw', price=Decimal('10.00'))
+        Product.objects.create(title='Axe', slug='axe', price=Decimal('20.00'))
+        next_page = self.client.get('/api/products/?page_size=1').json()['next']
+        for url in ('/api/products/', next_page, '/api/categories/'):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(len(queries), 1)
+                self.assertIn('core_catalogversion', queries[0]['sql'])
+
+    def test_delete_moves_last_modified(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .models import CatalogVersion
+
+        product = Product.objects.create(title='Saw', slug='saw', price=Decimal('10.00'))
+        Product.objects.create(title='Axe', slug='axe', price=Decimal('20.00'))
+        CatalogVersion.objects.filter(pk=1).update(updated_at=timezone.now() - timedelta(minutes=1))
+        last_modified = self.client.get('/api/products/')['Last-Modified']
+        self.assertEqual(
+            self.client.get('/api/products/', headers={'If-Modified-Since': last_modified}).status_code, 304,
+        )
+        product.delete()
+        response = self.client.get('/api/products/', headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('"saw"', response.content.decode())
+
+    def test_non_numeric_pk_is_not_found(self):
+        for url in ('/api/products/abc/', '/api/categories/abc/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_category_rename_moves_product_validators(self):
+        category = Category.objects.create(name='Tools', slug='tools')
+        product = Product.objects.create(title='Saw', slug='saw', price=Decimal('10.00'), category=category)
+        for url in ('/api/products/', f'/api/products/{product.pk}/'):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+                category.slug = category.slug + '-x'
+                category.save()
+                response = self.client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(category.slug, response.content.decode())
+
+
+@override_settings(PAYMENT_GATEWAY='core.payments.LocalGateway', STORAGES=UNHASHED_STATIC)
+class CheckoutSessionTests(TestCase):
+    def setUp(self):
+        payments.reset_gateway()
+        self.addCleanup(payments.reset_gateway)
+        category = Category.objects.create(name='Books', slug='books')
+        self.product = Product.objects.create(title='Novel', slug='novel', price=Decimal('250.00'), category=category)
+        self.user = User.objects.create_user('buyer', 'buyer@example.com', 'pw')
+        self.client = Client(enforce_csrf_checks=True)
+        self.client.force_login(self.user)
+        # The storefront gets its CSRF cookie from any page with a form
+        self.client.get('/cart/')
+
+    def post_cart(self, **headers):
+        return self.client.post(
+            '/api/create-checkout-session/',
+            {'items': [{'id': self.product.pk, 'title': 'Novel', 'quantity': 2}]},
+            content_type='application/json',
+            headers=headers,
+        )
+
+    def test_session_user_gets_pending_order_and_payment(self):
+        response = self.post_cart(**{'X-CSRFToken': self.client.cookies['csrftoken'].value})
+        self.assertEqual(response.status_code, 200)
+        order = Order.objects.get(user=self.user)
+        self.assertEqual((order.payment_method, order.payment_status), ('online', 'pending'))
+        self.assertEqual(order.total_amount, Decimal('500.00'))
+        payment = Payment.objects.get(order=order)
+        self.assertEqual(payment.stripe_payment_id, response.json()['id'])
+
+    def test_session_user_without_csrf_token_is_rejected(self):
+        self.assertEqual(self.post_cart().status_code, 403)
+        self.assertFalse(Order.objects.exists())
+
+
+class PageCacheTests(TestCase):
+    def test_bump_made_elsewhere_invalidates_fragments(self):
+        from django.core.cache import cache
+        from . import page_cache
+        from .models import CatalogVersion
+
+        self.addCleanup(cache.clear)
+        self.assertEqual(page_cache.get_or_render('grid', lambda: 'old'), 'old')
+        self.assertEqual(page_cache.get_or_render('grid', lambda: 'new'), 'old')
+        # Another process bumps the shared row; this process's cache is untouched
+        CatalogVersion.objects.filter(pk=1).update(version=CatalogVersion.objects.get(pk=1).version + 1)
+        self.assertEqual(page_cache.get_or_render('grid', lambda: 'new'), 'new')
+
+
+class InventoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('shopper', 'shopper@example.com', 'pw')
+        self.untracked = Product.objects.create(title='Poster', slug='poster', price=Decimal('50.00'))
+        self.tracked = Product.objects.create(title='Lamp', slug='lamp', price=Decimal('900.00'), stock=5)
+
+    def test_untracked_products_cost_no_stock_update(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .orders import place_order
+
+        with CaptureQueriesContext(connection) as queries:
+            place_order(self.user, {self.untracked.pk: 2, self.tracked.pk: 1})
+        product_updates = [q for q in queries if q['sql'].startswith('UPDATE "core_product"')]
+        self.assertEqual(len(product_updates), 1)
+        self.tracked.refresh_from_db()
+        self.assertEqual(self.tracked.stock, 4)
+
+    def test_reservation_ids_must_be_a_list(self):
+        from .orders import CheckoutError, parse_reservation_ids
+
+        self.assertEqual(parse_reservation_ids([12, '3']), [12, 3])
+        with self.assertRaises(CheckoutError):
+            parse_reservation_ids("12")
+
+    def test_reservations_share_one_pending_sweep(self):
+        from . import inventory
+        from .models import Job
+
+        inventory.reserve(self.user, {self.tracked.pk: 1})
+        inventory.reserve(self.user, {self.tracked.pk: 1})
+        sweeps = Job.objects.filter(task='core.tasks.release_expired_reservations', status=Job.QUEUED)
+        self.assertEqual(sweeps.count(), 1)
+
+
+class SalesAnalyticsTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Garden', slug='garden')
+        self.product = Product.objects.create(title='Hose', slug='hose', price=Decimal('399.50'), category=self.category)
+        self.loose = Product.objects.create(title='Gift card', slug='gift-card', price=Decimal('100.00'))
+        self.admin = User.objects.create_superuser('boss', 'boss@example.com', 'pw')
+
+    def place(self, quantities):
+        from .orders import place_order
+        return place_order(self.admin, quantities, payment_method='cod', payment_status='pending')
+
+    def test_report_serves_revenue_as_string(self):
+        self.place({self.product.pk: 2})
+        client = Client()
+        client.force_login(self.admin)
+        data = client.get('/api/analytics/?group_by=category').json()
+        self.assertEqual(data['totals'], {'revenue': '799.00', 'units': 2, 'order_count': 1})
+        self.assertEqual(data['results'][0]['revenue'], '799.00')
+        self.assertEqual(data['results'][0]['category'], 'garden')
+
+    def test_cancel_after_recategorizing_debits_the_original_category(self):
+        from .models import DailyCategorySales
+        from .orders import cancel_order
+
+        order = self.place({self.product.pk: 2})
+        moved_to = Category.objects.create(name='Tools', slug='tools')
+        self.product.category = moved_to
+        self.product.save()
+        cancel_order(order)
+        rows = DailyCategorySales.objects.values_list('category_id', 'revenue', 'units', 'order_count')
+        self.assertEqual(list(rows), [(self.category.pk, Decimal('0.00'), 0, 0)])
+
+    def test_deleted_category_and_uncategorized_rows_stay_separate(self):
+        from .models import DailyCategorySales
+
+        self.place({self.product.pk: 1, self.loose.pk: 1})
+        category_id = self.category.pk
+        self.category.delete()
+        self.place({self.loose.pk: 2})
+        rows = sorted(
+            DailyCategorySales.objects.values_list('category_id', 'units', 'order_count'),
+            key=lambda row: row[0] or 0,
+        )
+        self.assertEqual(rows, [(None, 3, 2), (category_id, 1, 1)])
+
+
+class SessionUserTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('member', 'member@example.com', 'pw')
+        self.client.force_login(self.user, backend='core.backends.EmailBackend')
+        self.assertEqual(self.client.get('/api/orders/').status_code, 200)
+
+    def test_deactivation_elsewhere_is_seen_on_next_request(self):
+        # A queryset update sends no signal, like a save in another worker
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+
+    @override_settings(PER_PROCESS_CACHE=False)
+    def test_shared_cache_entry_is_dropped_on_save(self):
+        self.assertEqual(self.client.get('/api/orders/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+
+
+class ProductBulkTests(TestCase):
+    def setUp(self):
+        self.products = [
+            Product.objects.create(title=f'Mug {n}', slug=f'mug-{n}', price=Decimal('120.00'))
+            for n in range(3)
+        ]
+        self.ids = [p.pk for p in self.products]
+
+    def test_get_and_post_return_known_ids(self):
+        expected = {str(pk) for pk in self.ids}
+        query = ','.join(map(str, self.ids + [999999]))
+        for response in (
+            self.client.get(f'/api/products/bulk/?ids={query}'),
+            self.client.post('/api/products/bulk/', {'ids': self.ids + [999999]}, content_type='application/json'),
+        ):
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(set(response.json()), expected)
+            self.assertEqual(response.json()[str(self.ids[0])]['price'], '120.00')
+
+    def test_at_most_100_ids(self):
+        ok = self.client.get('/api/products/bulk/?ids=' + ','.join(map(str, range(1, 101))))
+        self.assertEqual(ok.status_code, 200)
+        too_many = self.client.get('/api/products/bulk/?ids=' + ','.join(map(str, range(1, 102))))
+        self.assertEqual(too_many.status_code, 400)
+
+    def test_malformed_input_is_rejected(self):
+        for body in ([1, 2], {'ids': '12'}, {'ids': 12}, {'ids': [[1]]}, {'ids': ['x']}):
+            with self.subTest(body=body):
+                response = self.client.post('/api/products/bulk/', body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/api/products/bulk/?ids=1,x').status_code, 400)
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        import io
+        import tempfile
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+        from PIL import Image
+        from . import images
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        images._manifests.clear()
+        self.addCleanup(images._manifests.clear)
+        buf = io.BytesIO()
+        Image.new('RGB', (400, 300), 'red').save(buf, 'JPEG')
+        self.name = default_storage.save('products/lamp.jpg', ContentFile(buf.getvalue()))
+        images.generate_variants(self.name)
+
+    def test_template_filter_and_serializer_share_cached_srcsets(self):
+        from unittest import mock
+        from django.core.files.storage import default_storage
+        from .templatetags.product_images import srcset
+        from . import images
+
+        expected = images.srcsets(self.name)
+        self.assertEqual([w for w, _ in images.available_variants(self.name, 'webp')], [160, 320, 400])
+        with mock.patch.object(default_storage, 'url', side_effect=AssertionError('URL rebuilt')):
+            product = Product(image=self.name)
+            for fmt in ('webp', 'jpeg'):
+                self.assertEqual(srcset(product.image, fmt), expected[fmt])
+            self.assertTrue(images.best_variant_url(self.name, 300).endswith('lamp-320w.jpg'))
+
+
+class GenerateCatalogTests(TestCase):
+    def test_products_keep_generated_timestamps(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        call_command('generate_catalog', categories=3, products=50, users=0, orders=0, stdout=StringIO())
+        self.assertGreater(Product.objects.values('created_at').distinct().count(), 40)
+
+    def auto_flags(self):
+        return [(f.auto_now, f.auto_now_add) for f in map(Product._meta.get_field, ('created_at', 'updated_at'))]
+
+    def test_failed_insert_restores_auto_timestamps(self):
+        from unittest import mock
+        from .management.commands.generate_catalog import explicit_timestamps
+
+        self.assertEqual(self.auto_flags(), [(False, True), (True, False)])
+        with mock.patch.object(Product.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError), explicit_timestamps(Product):
+                self.assertEqual(self.auto_flags(), [(False, False), (False, False)])
+                Product.objects.bulk_create([Product(title='x', slug='x', price=1)])
+        self.assertEqual(self.auto_flags(), [(False, True), (True, False)])
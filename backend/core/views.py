@@ -1,51 +1,232 @@
 from rest_framework import viewsets
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 from django.contrib.auth.decorators import login_required
+from rest_framework.exceptions import ValidationError
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from django.shortcuts import render, get_object_or_404, redirect
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 from django.conf import settings
+from django.db.models import Prefetch
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.utils import timezone
-from .models import Product, Category, Order, UserProfile, OrderItem
-from decimal import Decimal
-from .serializers import ProductSerializer, CategorySerializer
-import stripe
+from .models import Product, Category, Order, OrderItem, Payment, UserProfile
+from . import page_cache
+from .orders import COD_CHARGE, CheckoutError, cancel_order, parse_cart, parse_reservation_ids, place_order
+from .serializers import ProductSerializer, ProductValuesSerializer, CategorySerializer, OrderSerializer
+from .pagination import KeysetPagination, OrderPagination, SearchPagination
+from .search import ProductSearchFilter
+from .filters import ProductCategoryFilter
+from .renderers import JSONLinesRenderer, gzip_chunks, jsonl_chunks
+from .conditional import ConditionalGetMixin
+from . import analytics, images, inventory, payments, webhooks
+from .backends import users_by_email
 
 # ---------------------------------------------------------
-# Stripe Setup
+# API VIEWSETS
 # ---------------------------------------------------------
-stripe.api_key = settings.STRIPE_SECRET_KEY
+class ProductValuesListMixin:
+    """
+    List products from .values() rows through ProductValuesSerializer,
+    selecting only the columns the requested ?fields= need.
+    """
+    def list(self, request, *args, **kwargs):
+        serializer = ProductValuesSerializer(
+            fields=self.get_requested_fields(),
+            context=self.get_serializer_context(),
+        )
+        queryset = self.filter_queryset(self.get_queryset()).values(*serializer.db_fields)
+        if request.accepted_renderer.format == JSONLinesRenderer.format:
+            return self.stream_list(queryset, serializer)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(serializer.serialize(page))
+
+    def stream_list(self, queryset, serializer):
+        """
+        ?format=jsonl: every matching product, unpaginated, as JSON Lines.
+
+        Rows come from a server-side iterator PRODUCT_EXPORT_CHUNK_SIZE at a
+        time and each chunk is written as soon as it is serialized, so memory
+        stays flat and the first bytes leave after one chunk, whatever the
+        catalog size. ?compress=gzip gzips the stream on the fly.
+        """
+        compress = self.request.query_params.get('compress', '')
+        if compress not in ('', 'gzip'):
+            raise ValidationError({'compress': "Use 'gzip' or leave it out"})
+        if not ProductSearchFilter.get_search_text(self.request):
+            # Same ?ordering= as the paginated list, read straight off its index
+            queryset = KeysetPagination().order_queryset(queryset, self.request)
+
+        chunk_size = settings.PRODUCT_EXPORT_CHUNK_SIZE
+        chunks = jsonl_chunks(queryset.iterator(chunk_size=chunk_size), serializer.serialize, chunk_size)
+        if compress:
+            response = StreamingHttpResponse(gzip_chunks(chunks), content_type='application/gzip')
+            response['Content-Disposition'] = 'attachment; filename="products.jsonl.gz"'
+        else:
+            response = StreamingHttpResponse(chunks, content_type=JSONLinesRenderer.media_type)
+        return response
 
 
-# ---------------------------------------------------------
-# API VIEWSETS
-# ---------------------------------------------------------
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Product.objects.all().order_by('-created_at')
+class ProductViewSet(ConditionalGetMixin, ProductValuesListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Product.objects.select_related('category').order_by('-created_at')
     serializer_class = ProductSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [ProductCategoryFilter, ProductSearchFilter]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, JSONLinesRenderer]
+
+    @property
+    def paginator(self):
+        # Ranked ?search= results can't be keyset-paginated on created_at
+        if not hasattr(self, '_paginator'):
+            if ProductSearchFilter.get_search_text(self.request):
+                self._paginator = SearchPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_requested_fields(self):
+        """Field names from ?fields=id,title,price, or None for all fields."""
+        raw = self.request.query_params.get('fields', '')
+        fields = [name.strip() for name in raw.split(',') if name.strip()]
+        if not fields:
+            return None
+        unknown = set(fields) - set(ProductSerializer().fields)
+        if unknown:
+            raise ValidationError({'fields': f"Unknown field(s): {', '.join(sorted(unknown))}"})
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_requested_fields()
+        if fields and self.action == 'retrieve':
+            columns = ProductValuesSerializer(fields=fields).db_fields
+            if 'category__slug' not in columns:
+                # only() can't defer a relation that select_related follows
+                queryset = queryset.select_related(None)
+            queryset = queryset.only(*columns)
+        return queryset
+
+    BULK_MAX_IDS = 100
+
+    @action(detail=False, methods=['get', 'post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Resolve many products in one query: GET ?ids=1,2,3 or POST {"ids": [...]}.
+        Returns {"<id>": {"title", "price", "image"}}; unknown ids are omitted.
+        """
+        if request.method == 'POST':
+            raw_ids = request.data.get('ids', []) if isinstance(request.data, dict) else None
+            if not isinstance(raw_ids, (list, tuple)):
+                return Response({'error': 'Body must be {"ids": [...]}'}, status=400)
+        else:
+            raw_ids = request.query_params.get('ids', '').split(',')
+
+        try:
+            ids = {int(i) for i in raw_ids if str(i).strip()}
+        except (TypeError, ValueError):
+            return Response({'error': 'ids must be integers'}, status=400)
+
+        if len(ids) > self.BULK_MAX_IDS:
+            return Response({'error': f'At most {self.BULK_MAX_IDS} ids per request'}, status=400)
+
+        products = Product.objects.only('id', 'title', 'price', 'image').in_bulk(ids)
+        return Response({
+            str(pk): {
+                'title': p.title,
+                'price': str(p.price),
+                'image': p.image.url if p.image else None,
+            }
+            for pk, p in products.items()
+        })
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Category.objects.all()
+class CategoryViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Categories with their facet summary (product count, price range) read
+    from CategoryStats in the same query, so the cost doesn't grow with
+    the catalog. Validators also move when a category's products change.
+    """
+    queryset = Category.objects.select_related('stats').annotate(
+        changed_at=Greatest(
+            Coalesce('updated_at', 'stats__last_product_update'),
+            Coalesce('stats__last_product_update', 'updated_at'),
+        ),
+    )
     serializer_class = CategorySerializer
+    timestamp_field = 'changed_at'
+
+
+class OrderViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    The signed-in user's order history, newest first.
+
+    A page costs two queries whatever its size: the orders (a range scan on
+    the (user, ordered_at) index) and one prefetch of all their items with
+    the products joined in. The last page adds one seek for undated orders.
+    Session auth is accepted so the profile page can call it directly.
+    """
+    serializer_class = OrderSerializer
+    pagination_class = OrderPagination
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [JWTAuthentication, SessionAuthentication]
+
+    def get_queryset(self):
+        items = OrderItem.objects.select_related('product').only(
+            'id', 'order_id', 'quantity', 'price',
+            'product__id', 'product__title', 'product__slug', 'product__image',
+        )
+        return (
+            Order.objects
+            .filter(user=self.request.user, ordered=True)
+            .prefetch_related(Prefetch('items', queryset=items))
+        )
 
 
 # ---------------------------------------------------------
 # STRIPE CHECKOUT SESSION (API)
 # ---------------------------------------------------------
 @api_view(['POST'])
+@authentication_classes([JWTAuthentication, SessionAuthentication])
 def create_checkout_session(request):
+    """
+    For a signed-in customer (JWT, or the storefront's session cookie plus
+    X-CSRFToken) the cart becomes a pending online order first, charged at
+    server prices, with a pending Payment keyed by the session id; the
+    Stripe webhook (core.webhooks) later marks both paid or failed.
+    """
     items = request.data.get('items', [])
-    line_items = []
+    order = None
+    if request.user.is_authenticated:
+        try:
+            order = place_order(request.user, parse_cart(items), payment_method='online', payment_status='pending')
+        except CheckoutError as e:
+            return Response({'error': str(e)}, status=400)
+        except inventory.OutOfStock as e:
+            return Response({'error': str(e), 'product_ids': e.product_ids}, status=409)
+        prices = {item.product_id: item.price for item in order.items.all()}
 
+    line_items = []
     for it in items:
-        price = float(it.get('price', 0))
+        price = float(prices[int(it['id'])] if order else it.get('price', 0))
         quantity = int(it.get('quantity', 1))
 
+        # Stripe shows a small thumbnail; send a resized variant when we have one
         image_url = it.get('image')
         if image_url:
+            image_url = images.best_variant_url(images.name_from_url(image_url), 320) or image_url
             image_url = request.build_absolute_uri(image_url)
 
         line_items.append({
@@ -61,16 +242,48 @@ def create_checkout_session(request):
         })
 
     try:
-        session = stripe.checkout.Session.create(
-            payment_method_types=['card'],
-            mode='payment',
-            line_items=line_items,
+        session_id = payments.create_checkout_session(
+            line_items,
             success_url=settings.FRONTEND_URL + '/checkout/success/',
             cancel_url=settings.FRONTEND_URL + '/checkout/cancel/',
+            idempotency_key=request.headers.get('Idempotency-Key'),
+            metadata={'order_id': str(order.pk)} if order else None,
         )
-        return Response({'id': session.id})
-    except Exception as e:
-        return Response({'error': str(e)}, status=500)
+    except payments.GatewayError as e:
+        if order:
+            cancel_order(order)
+        if isinstance(e, payments.GatewayBusy):
+            return Response({'error': str(e)}, status=503, headers={'Retry-After': '1'})
+        return Response({'error': str(e)}, status=502)
+
+    if order:
+        if Payment.objects.filter(stripe_payment_id=session_id).exists():
+            # A retried Idempotency-Key got the original session back; that
+            # session already belongs to the first attempt's order
+            cancel_order(order)
+        else:
+            Payment.objects.create(
+                user=request.user, order=order, stripe_payment_id=session_id,
+                amount=order.total_amount, status='pending', payment_method='online',
+            )
+    return Response({'id': session_id})
+
+
+# ---------------------------------------------------------
+# STRIPE WEBHOOK
+# ---------------------------------------------------------
+@csrf_exempt
+@require_POST
+def stripe_webhook(request):
+    """
+    Verify and store the event, then acknowledge straight away; the
+    apply_stripe_events job folds stored events into payments in batches.
+    """
+    try:
+        webhooks.ingest(request.body, request.headers.get('Stripe-Signature', ''))
+    except webhooks.InvalidWebhook as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({'received': True})
 
 
 # ---------------------------------------------------------
@@ -86,52 +299,100 @@ def checkout_cod(request):
     if not request.user.is_authenticated:
         return Response({"error": "Login required"}, status=403)
 
-    if len(items) == 0:
-        return Response({"error": "Cart is empty"}, status=400)
+    try:
+        quantities = parse_cart(items)
+        order = place_order(
+            request.user,
+            quantities,
+            cod_fee=COD_CHARGE,
+            reservation_ids=parse_reservation_ids(data.get("reservation_ids")),
+            payment_method="cod",
+            payment_status="pending",
+
+            full_name=customer.get("name"),
+            phone=customer.get("phone"),
+            email=customer.get("email"),
+
+            address_line1=customer.get("address"),
+            city=customer.get("city"),
+            state=customer.get("state"),
+            postal_code=customer.get("pincode"),
+            country="India"
+        )
+    except CheckoutError as e:
+        return Response({"error": str(e)}, status=400)
+    except inventory.OutOfStock as e:
+        return Response({"error": str(e), "product_ids": e.product_ids}, status=409)
+
+    return Response({
+        "success": True,
+        "order_id": order.id,
+        "total": order.total_amount
+    })
 
-    # COD Fee
-    COD_CHARGE = Decimal("30.00")  # you can change
 
-    order = Order.objects.create(
-        user=request.user,
-        payment_method="cod",
-        cod_fee=COD_CHARGE,
-        payment_status="pending",
+# ---------------------------------------------------------
+# API — Stock reservation
+# ---------------------------------------------------------
 
-        full_name=customer.get("name"),
-        phone=customer.get("phone"),
-        email=customer.get("email"),
+@api_view(["POST"])
+def reserve_stock(request):
+    """
+    Hold the cart's units for STOCK_RESERVATION_SECONDS while the customer
+    fills in checkout; pass the returned ids to checkout-cod as
+    "reservation_ids". Unused reservations expire back into stock.
+    """
+    if not request.user.is_authenticated:
+        return Response({"error": "Login required"}, status=403)
 
-        address_line1=customer.get("address"),
-        city=customer.get("city"),
-        state=customer.get("state"),
-        postal_code=customer.get("pincode"),
-        country="India"
-    )
+    try:
+        quantities = parse_cart(request.data.get("items", []))
+        reservations = inventory.reserve(request.user, quantities)
+    except CheckoutError as e:
+        return Response({"error": str(e)}, status=400)
+    except inventory.OutOfStock as e:
+        return Response({"error": str(e), "product_ids": e.product_ids}, status=409)
 
-    total = Decimal("0.00")
+    return Response({
+        "reservation_ids": [r.pk for r in reservations],
+        "expires_at": reservations[0].expires_at,
+    }, status=201)
 
-    for item in items:
-        product = Product.objects.get(id=item["id"])
-        qty = item["quantity"]
-        price = Decimal(str(item["price"]))
 
-        OrderItem.objects.create(
-            order=order,
-            product=product,
-            quantity=qty,
-            price=price
-        )
+# ---------------------------------------------------------
+# API — Sales analytics (staff only)
+# ---------------------------------------------------------
 
-        total += price * qty
+@api_view(["GET"])
+@authentication_classes([JWTAuthentication, SessionAuthentication])
+@permission_classes([IsAdminUser])
+def sales_analytics(request):
+    """
+    Revenue, units and orders per ?interval=day|week|month|year (or "all"
+    for one row) between ?start= and ?end= (YYYY-MM-DD, default the last
+    30 days), optionally split with ?group_by=category|payment_method.
+    Served from the daily rollups only.
+    """
+    params = request.query_params
+    try:
+        start, end = analytics.date_range(params)
+        interval = params.get("interval", "day")
+        group_by = params.get("group_by") or None
+        results = analytics.report(start, end, interval, group_by)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
 
-    order.total_amount = total + COD_CHARGE
-    order.save()
+    # Money goes out as a string, like every other price in the API
+    def with_revenue_text(row):
+        return {**row, "revenue": str(row["revenue"])}
 
     return Response({
-        "success": True,
-        "order_id": order.id,
-        "total": order.total_amount
+        "start": start,
+        "end": end,
+        "interval": interval,
+        "group_by": group_by,
+        "totals": with_revenue_text(analytics.summary(start, end)),
+        "results": [with_revenue_text(row) for row in results],
     })
 
 
@@ -143,17 +404,34 @@ def landing_page(request):
 
 
 def index_page(request):
-    products = Product.objects.all().order_by('-created_at')[:100]
+    def render_grid():
+        products = Product.objects.all().order_by('-created_at')[:100]
+        return render_to_string('frontend/partials/product_grid.html', {
+            'products': products,
+        })
+
+    # Cached per catalog version: a hit skips both the query and the template
+    product_grid = page_cache.get_or_render('index:grid', render_grid)
     return render(request, 'frontend/index.html', {
-        'products': products,
+        'product_grid': mark_safe(product_grid),
         'stripe_public_key': settings.STRIPE_PUBLIC_KEY
     })
 
 
 def product_page(request, slug):
-    product = get_object_or_404(Product, slug=slug)
+    def render_detail():
+        product = get_object_or_404(Product, slug=slug)
+        return {
+            'title': product.title,
+            'detail': render_to_string('frontend/partials/product_detail.html', {
+                'product': product,
+            }),
+        }
+
+    cached = page_cache.get_or_render(f'product:{slug}', render_detail)
     return render(request, 'frontend/product.html', {
-        'product': product,
+        'product_title': cached['title'],
+        'product_detail': mark_safe(cached['detail']),
         'stripe_public_key': settings.STRIPE_PUBLIC_KEY
     })
 
@@ -181,25 +459,22 @@ def checkout_page(request, pk):
 
         # --- COD FLOW ---
         if payment_method == "cod":
-            order = Order.objects.create(
-                user=request.user,
-                ordered=True,
-                ordered_at=timezone.now(),
-                payment_method="cod",  # store cod
-                payment_status="pending",
-                full_name=full_name,
-                phone=phone,
-                address_line1=address,
-                postal_code=pincode,
-                total_amount=product.price
-            )
-
-            OrderItem.objects.create(
-                order=order,
-                product=product,
-                quantity=1,
-                price=product.price
-            )
+            try:
+                place_order(
+                    request.user,
+                    {product.pk: 1},
+                    payment_method="cod",  # store cod
+                    payment_status="pending",
+                    full_name=full_name,
+                    phone=phone,
+                    address_line1=address,
+                    postal_code=pincode,
+                )
+            except inventory.OutOfStock:
+                return render(request, 'frontend/checkout.html', {
+                    'product': product,
+                    'error': "Sorry, this product just sold out.",
+                }, status=409)
             return redirect("checkout-success")
 
         # --- ONLINE FLOW ---
@@ -245,7 +520,7 @@ def signup_view(request):
         country = request.POST.get("country", "India").strip()
         gender = request.POST.get("gender", "").strip()
 
-        if User.objects.filter(email=email).exists():
+        if users_by_email(email).exists():
             messages.error(request, "Email already exists")
             return redirect("signup")
 
@@ -269,7 +544,7 @@ def signup_view(request):
             country=country
         )
 
-        login(request, user)
+        login(request, user, backend='core.backends.EmailBackend')
         return redirect("profile")
 
     return render(request, "frontend/signup.html")
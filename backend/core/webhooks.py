@@ -0,0 +1,173 @@
+import json
+import logging
+from collections import defaultdict
+
+import stripe
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import analytics, inventory, jobs
+from .models import Order, OrderItem, Payment, StripeEvent
+
+logger = logging.getLogger('core.jobs')
+
+
+class InvalidWebhook(Exception):
+    """Bad signature or malformed payload."""
+
+
+# ---------------------------------------------------------
+# INGEST
+# ---------------------------------------------------------
+def ingest(payload, signature):
+    """
+    Verify a webhook body and store it in the inbox; returns the event id.
+
+    The request only does an HMAC check and one INSERT, so Stripe's retries
+    and bursts are acknowledged fast. Redelivered events hit the unique
+    event_id and are dropped. Applying them is left to the
+    apply_stripe_events job, queued at most once at a time.
+    """
+    try:
+        stripe.WebhookSignature.verify_header(
+            payload, signature, settings.STRIPE_WEBHOOK_SECRET,
+            tolerance=settings.STRIPE_WEBHOOK_TOLERANCE,
+        )
+        event = json.loads(payload)
+        event_id, event_type = event['id'], event['type']
+    except (stripe.SignatureVerificationError, ValueError, KeyError, TypeError) as e:
+        raise InvalidWebhook(str(e)) from e
+
+    StripeEvent.objects.bulk_create(
+        [StripeEvent(event_id=event_id, type=event_type, payload=event)],
+        ignore_conflicts=True,
+    )
+    jobs.enqueue_once('core.tasks.apply_stripe_events')
+    return event_id
+
+
+# ---------------------------------------------------------
+# APPLY
+# ---------------------------------------------------------
+# Checkout session event -> (Payment.status, Order.payment_status).
+# checkout.session.completed is only final when the session is 'paid';
+# delayed methods (bank debits) follow up with async_payment_*.
+SESSION_OUTCOMES = {
+    'checkout.session.completed': ('success', 'paid'),
+    'checkout.session.async_payment_succeeded': ('success', 'paid'),
+    'checkout.session.async_payment_failed': ('failed', 'failed'),
+    'checkout.session.expired': ('failed', 'failed'),
+}
+
+# A session settles once: pending moves to failed or success and stays
+# there, so replayed or out-of-order events are no-ops (and units returned
+# for a failed order are never sold twice)
+PAYMENT_RANK = {'pending': 0, 'failed': 1, 'success': 1}
+
+
+def session_outcome(event):
+    session = event['data']['object']
+    outcome = SESSION_OUTCOMES.get(event['type'])
+    if event['type'] == 'checkout.session.completed' and session.get('payment_status') != 'paid':
+        outcome = ('pending', 'pending')
+    return session, outcome
+
+
+def apply_pending(batch_size=None):
+    """Apply unprocessed inbox events in batches; returns how many were processed."""
+    batch_size = batch_size or settings.STRIPE_EVENT_BATCH_SIZE
+    processed = 0
+    while True:
+        events = list(
+            StripeEvent.objects.filter(processed_at__isnull=True)
+            .order_by('id').only('id', 'type', 'payload')[:batch_size]
+        )
+        if not events:
+            return processed
+        with transaction.atomic():
+            apply_batch(events)
+            StripeEvent.objects.filter(pk__in=[e.pk for e in events]).update(processed_at=timezone.now())
+        processed += len(events)
+
+
+def apply_batch(events):
+    """
+    Fold a batch of events into Payment and Order rows.
+
+    Events are first reduced to one final outcome per checkout session, so
+    a thousand events cost a handful of queries: lookups of the existing
+    payments and their orders, a bulk_create for payments first seen here,
+    a bulk_update, and one UPDATE per distinct order status.
+    """
+    sessions = {}
+    for event in events:
+        session, outcome = session_outcome(event.payload)
+        if outcome is None:
+            continue
+        current = sessions.get(session['id'])
+        if current is None or PAYMENT_RANK[outcome[0]] > PAYMENT_RANK[current[1][0]]:
+            sessions[session['id']] = (session, outcome)
+    if not sessions:
+        return
+
+    payments = {
+        p.stripe_payment_id: p
+        for p in Payment.objects.filter(stripe_payment_id__in=list(sessions))
+    }
+
+    # Sessions created outside our checkout view carry the order id in metadata
+    order_ids = {
+        int((session.get('metadata') or {}).get('order_id') or 0)
+        for session_id, (session, _) in sessions.items() if session_id not in payments
+    } | {p.order_id for p in payments.values() if p.order_id}
+    orders = Order.objects.only('id', 'user_id', 'payment_status').in_bulk(order_ids - {0})
+    # Payment.order is one-to-one: an order paid through another session keeps its payment
+    has_payment = set(
+        Payment.objects.filter(order_id__in=list(orders)).values_list('order_id', flat=True)
+    ) - {p.order_id for p in payments.values()}
+
+    new_payments, changed_payments = [], []
+    order_status = {}
+    for session_id, (session, (payment_status, order_payment_status)) in sessions.items():
+        payment = payments.get(session_id)
+        if payment is None:
+            order = orders.get(int((session.get('metadata') or {}).get('order_id') or 0))
+            if order is None or order.pk in has_payment:
+                logger.warning("Stripe session %s matches no unpaid order, skipped", session_id)
+                continue
+            payment = Payment(
+                user_id=order.user_id, order=order, stripe_payment_id=session_id,
+                amount=(session.get('amount_total') or 0) / 100, status='pending',
+                payment_method='online',
+            )
+            new_payments.append(payment)
+        elif PAYMENT_RANK[payment_status] <= PAYMENT_RANK.get(payment.status, 0):
+            continue
+        else:
+            changed_payments.append(payment)
+        payment.status = payment_status
+        if payment.order_id in orders:
+            order_status[payment.order_id] = order_payment_status
+
+    Payment.objects.bulk_create(new_payments)
+    Payment.objects.bulk_update(changed_payments, ['status'])
+
+    by_status = defaultdict(list)
+    for order_id, status in order_status.items():
+        if orders[order_id].payment_status != status:
+            by_status[status].append(order_id)
+    for status, ids in by_status.items():
+        Order.objects.filter(pk__in=ids).update(payment_status=status)
+
+    # Units held by orders that will never be paid go back on sale, and
+    # their lines come out of the sales rollups
+    failed = by_status.get('failed', [])
+    if failed:
+        restock = defaultdict(int)
+        for product_id, quantity in OrderItem.objects.filter(order_id__in=failed).values_list('product_id', 'quantity'):
+            restock[product_id] += quantity
+        inventory.return_stock(restock)
+        analytics.remove_orders(failed)
+    for order_id in by_status.get('paid', []):
+        jobs.enqueue('core.tasks.send_order_confirmation', {'order_id': order_id})
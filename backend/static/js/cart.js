@@ -36,6 +36,20 @@ function displayCart() {
     });
 }
 
+// Fetch {id: details} for many products, in batches the bulk endpoint accepts
+const BULK_MAX_IDS = 100;
+
+async function fetchProducts(ids) {
+    let products = {};
+    for (let i = 0; i < ids.length; i += BULK_MAX_IDS) {
+        let batch = ids.slice(i, i + BULK_MAX_IDS).join(',');
+        let response = await fetch(`/api/products/bulk/?ids=${batch}`);
+        if (!response.ok) throw new Error(`Could not load cart products (${response.status})`);
+        Object.assign(products, await response.json());
+    }
+    return products;
+}
+
 // Checkout using Stripe
 async function checkout() {
     let cart = getCart();
@@ -44,14 +58,18 @@ async function checkout() {
         return;
     }
 
-    // Fetch product details from API to send to Stripe
+    // Fetch details for the whole cart, one request per 100 products
+    let products = await fetchProducts([...new Set(cart.map(item => item.id))]);
+
     let lineItems = [];
     for (let item of cart) {
-        let response = await fetch(`/api/products/${item.id}/`);
-        let data = await response.json();
+        let data = products[item.id];
+        if (!data) continue;
         lineItems.push({
+            id: item.id,
             title: data.title,
             price: data.price,
+            image: data.image,
             quantity: item.quantity
         });
     }
@@ -59,7 +77,11 @@ async function checkout() {
     // Create checkout session
     let res = await fetch('/api/create-checkout-session/', {
         method: 'POST',
-        headers: {'Content-Type': 'application/json'},
+        headers: {
+            'Content-Type': 'application/json',
+            // csrfToken() comes from base.html; session checkouts need it
+            'X-CSRFToken': typeof csrfToken === 'function' ? csrfToken() : ''
+        },
         body: JSON.stringify({items: lineItems})
     });
     let session = await res.json();
@@ -1,8 +1,16 @@
 // main.js - fetches products and renders them, simple search
 async function fetchProducts(q='') {
-  const url = '/api/products/' + (q ? '?search=' + encodeURIComponent(q) : '')
+  // Page links like /?category=<slug>&ordering=price are passed through to the API
+  const page = new URLSearchParams(location.search)
+  const params = new URLSearchParams()
+  for (const name of ['category', 'ordering']) {
+    if (page.get(name)) params.set(name, page.get(name))
+  }
+  if (q) params.set('search', q)
+  const url = '/api/products/' + (params.toString() ? '?' + params : '')
   const r = await fetch(url)
-  return r.json()
+  const data = await r.json()
+  return data.results
 }
 function renderProducts(products){
   const container = document.getElementById('products')